@@ -0,0 +1,243 @@
+"""
+Maintenance Operations Center - Work Order Archive Compaction
+
+Tiered retention for closed work orders (data_management.retention_policies):
+- Hot tier: active orders in `coord.work_orders`, the only data hot-path commands touch
+- Archive tier: completed/cancelled orders past a configurable age, compacted into
+  zstd-compressed columnar segments with a manifest of per-segment min/max dates
+- Expiry: whole segments dropped once past the completed work order retention period
+
+Each segment is two files: a small column file read by reports and a cold file with
+full work order dumps (photos, communication logs) read only when a record is opened.
+"""
+
+import asyncio
+import json
+import os
+import uuid
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Iterable, Iterator, MutableMapping
+
+import zstandard
+
+from work_order_store import hot_values
+
+CLOSED_STATUSES = ("completed", "cancelled")
+
+SEGMENT_COLUMNS = ("id", "building", "unit", "status", "priority", "assigned_technician",
+                   "created_at", "closed_at", "estimated_duration_hours")
+
+# =============================================================================
+# SEGMENT MANIFEST
+# =============================================================================
+
+@dataclass
+class SegmentInfo:
+    """Manifest entry for one archive segment"""
+    segment_id: str
+    min_date: str
+    max_date: str
+    count: int
+    created_at: str
+
+    def overlaps(self, start: date, end: date) -> bool:
+        return date.fromisoformat(self.min_date) <= end and date.fromisoformat(self.max_date) >= start
+
+def closed_at(data: Dict[str, Any]) -> datetime:
+    """When a work order was closed, falling back through status and update timestamps"""
+    status = data.get("status")
+    for value in (data.get("completed_at"),
+                  status.get("updated_at") if isinstance(status, dict) else None,
+                  data.get("updated_at"),
+                  data.get("created_at")):
+        if value:
+            return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    raise ValueError(f"Work order {data.get('id')} has no timestamps")
+
+def _write_atomic(path: Path, payload: bytes):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class WorkOrderArchive:
+    """Reads and writes compressed archive segments under `archive_dir`"""
+
+    def __init__(self, archive_dir: str = "archive", compression_level: int = 10):
+        self.archive_dir = Path(archive_dir)
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.archive_dir / "manifest.json"
+        self.compression_level = compression_level
+        self.segments: List[SegmentInfo] = self._load_manifest()
+
+    def _load_manifest(self) -> List[SegmentInfo]:
+        if not self.manifest_path.exists():
+            return []
+        with open(self.manifest_path, "r") as f:
+            return [SegmentInfo(**entry) for entry in json.load(f)["segments"]]
+
+    def _save_manifest(self):
+        payload = json.dumps({"segments": [asdict(s) for s in self.segments]}, indent=2).encode()
+        _write_atomic(self.manifest_path, payload)
+
+    def _paths(self, segment_id: str):
+        return (self.archive_dir / f"{segment_id}.cols.zst", self.archive_dir / f"{segment_id}.cold.zst")
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def write_segment(self, dumps: List[Dict[str, Any]]) -> SegmentInfo:
+        """Write one segment from work order dumps and register it in the manifest"""
+        dumps = sorted(dumps, key=closed_at)
+        columns: Dict[str, List[Any]] = {name: [] for name in SEGMENT_COLUMNS}
+        for data in dumps:
+            hot = hot_values(data)
+            hot["closed_at"] = closed_at(data)
+            for name in SEGMENT_COLUMNS:
+                value = hot[name]
+                columns[name].append(value.isoformat() if isinstance(value, datetime) else value)
+
+        compressor = zstandard.ZstdCompressor(level=self.compression_level)
+        segment_id = f"seg-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        cols_path, cold_path = self._paths(segment_id)
+        _write_atomic(cols_path, compressor.compress(json.dumps(columns).encode()))
+        _write_atomic(cold_path, compressor.compress(json.dumps(dumps, default=str).encode()))
+
+        dates = [datetime.fromisoformat(value).date() for value in columns["created_at"] + columns["closed_at"]
+                 if value]
+        info = SegmentInfo(
+            segment_id=segment_id,
+            min_date=min(dates).isoformat(),
+            max_date=max(dates).isoformat(),
+            count=len(dumps),
+            created_at=datetime.now().isoformat()
+        )
+        self.segments.append(info)
+        self._save_manifest()
+        return info
+
+    def drop_segments(self, segments: Iterable[SegmentInfo]) -> int:
+        doomed = {s.segment_id for s in segments}
+        self.segments = [s for s in self.segments if s.segment_id not in doomed]
+        self._save_manifest()
+        for segment_id in doomed:
+            for path in self._paths(segment_id):
+                path.unlink(missing_ok=True)
+        return len(doomed)
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def read_columns(self, segment: SegmentInfo) -> Dict[str, List[Any]]:
+        cols_path, _ = self._paths(segment.segment_id)
+        with open(cols_path, "rb") as f:
+            return json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+
+    def read_cold(self, segment: SegmentInfo) -> List[Dict[str, Any]]:
+        _, cold_path = self._paths(segment.segment_id)
+        with open(cold_path, "rb") as f:
+            return json.loads(zstandard.ZstdDecompressor().decompress(f.read()))
+
+    def segments_between(self, start: date, end: date) -> List[SegmentInfo]:
+        """Segments whose date range intersects [start, end], using only the manifest"""
+        return [s for s in self.segments if s.overlaps(start, end)]
+
+    def orders_on(self, day: date) -> Iterator[Dict[str, Any]]:
+        """Archived orders created or closed on `day`, as dicts of segment columns"""
+        for segment in self.segments_between(day, day):
+            columns = self.read_columns(segment)
+            for row in zip(*(columns[name] for name in SEGMENT_COLUMNS)):
+                record = dict(zip(SEGMENT_COLUMNS, row))
+                if day.isoformat() in ((record["created_at"] or "")[:10], record["closed_at"][:10]):
+                    yield record
+
+    def find(self, work_order_id: str) -> Optional[Dict[str, Any]]:
+        """Full archived dump of one work order"""
+        for segment in self.segments:
+            if work_order_id in self.read_columns(segment)["id"]:
+                return next(d for d in self.read_cold(segment) if d["id"] == work_order_id)
+        return None
+
+# =============================================================================
+# COMPACTION
+# =============================================================================
+
+@dataclass
+class CompactionResult:
+    archived: int
+    segments_written: int
+    segments_expired: int
+
+def _dump(work_order: Any) -> Dict[str, Any]:
+    return work_order if isinstance(work_order, dict) else work_order.model_dump(mode="json")
+
+def _status(work_order: Any) -> Optional[str]:
+    return hot_values(work_order)["status"] if isinstance(work_order, dict) else work_order.status.current
+
+def created_or_closed_on(work_order: Any, day: date) -> bool:
+    """Whether a live work order was created or closed on `day`, the same test `orders_on` applies"""
+    data = _dump(work_order)
+    created = data.get("created_at")
+    if created and (created if isinstance(created, datetime) else datetime.fromisoformat(created)).date() == day:
+        return True
+    return _status(work_order) in CLOSED_STATUSES and closed_at(data).date() == day
+
+def compact(
+    work_orders: MutableMapping[str, Any],
+    archive: WorkOrderArchive,
+    archive_after_days: int = 90,
+    retention_years: Optional[int] = 7,
+    segment_size: int = 10_000,
+    now: Optional[datetime] = None
+) -> CompactionResult:
+    """Move closed orders older than `archive_after_days` out of `work_orders` into segments
+
+    Orders are removed from the hot mapping only after their segment and the manifest
+    have been written, so an interrupted run never loses data.
+    """
+    now = now or datetime.now()
+    cutoff = now - timedelta(days=archive_after_days)
+
+    eligible = []
+    for work_order_id, work_order in list(work_orders.items()):
+        if _status(work_order) not in CLOSED_STATUSES:
+            continue
+        data = _dump(work_order)
+        if closed_at(data) < cutoff:
+            eligible.append(data)
+    eligible.sort(key=closed_at)
+
+    written = 0
+    for start in range(0, len(eligible), segment_size):
+        batch = eligible[start:start + segment_size]
+        archive.write_segment(batch)
+        for data in batch:
+            work_orders.pop(data["id"], None)
+        written += 1
+
+    expired = 0
+    if retention_years is not None:
+        expiry = (now - timedelta(days=365 * retention_years)).date()
+        expired = archive.drop_segments(s for s in archive.segments if date.fromisoformat(s.max_date) < expiry)
+
+    return CompactionResult(len(eligible), written, expired)
+
+async def run_compaction_loop(
+    work_orders: MutableMapping[str, Any],
+    archive: WorkOrderArchive,
+    interval_seconds: float = 6 * 3600,
+    on_result: Optional[Any] = None,
+    **compact_kwargs
+):
+    """Background task compacting on a fixed interval; the work runs off the event loop"""
+    while True:
+        result = await asyncio.to_thread(compact, work_orders, archive, **compact_kwargs)
+        if on_result:
+            on_result(result)
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,321 @@
+"""
+Maintenance Operations Center - Local Calendar Engine
+
+Keeps every technician's booked time in memory so open slots can be found
+across the whole team without querying the external calendar per technician:
+- Augmented AVL interval tree per technician (ordered by start, max-end pruning)
+- Skill and building indexes for candidate selection
+- Incremental sync from the CalendarAgent using an updated-since watermark
+- Earliest-slot search constrained to working hours and a deadline
+"""
+
+import inspect
+from dataclasses import dataclass
+from datetime import datetime, timedelta, time as dt_time
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
+
+# Keyword hints used to derive the required skill from a work order description
+SKILL_KEYWORDS = {
+    "plumbing": ["leak", "faucet", "toilet", "sink", "drain", "pipe", "water heater", "clog"],
+    "electrical": ["outlet", "switch", "breaker", "wiring", "light fixture", "sparks", "electrical"],
+    "hvac": ["hvac", "heat", "furnace", "boiler", "ac ", "air condition", "thermostat", "filter"],
+    "appliance_repair": ["refrigerator", "stove", "oven", "dishwasher", "washer", "dryer", "appliance"],
+    "painting": ["paint", "touch up", "scuff"],
+    "drywall": ["drywall", "nail holes", "hole in wall"],
+}
+
+def infer_required_skill(text: str) -> str:
+    """Best-guess skill for a work order description, defaulting to general maintenance"""
+    lowered = text.lower()
+    for skill, keywords in SKILL_KEYWORDS.items():
+        if any(keyword in lowered for keyword in keywords):
+            return skill
+    return "general_maintenance"
+
+# =============================================================================
+# INTERVAL TREE
+# =============================================================================
+
+@dataclass(frozen=True)
+class Booking:
+    """A booked block of technician time"""
+    start: datetime
+    end: datetime
+    event_id: str
+    work_order_id: Optional[str] = None
+
+class _Node:
+    __slots__ = ("booking", "max_end", "height", "left", "right")
+
+    def __init__(self, booking: Booking):
+        self.booking = booking
+        self.max_end = booking.end
+        self.height = 1
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+def _height(node: Optional[_Node]) -> int:
+    return node.height if node else 0
+
+def _update(node: _Node) -> _Node:
+    node.height = 1 + max(_height(node.left), _height(node.right))
+    node.max_end = node.booking.end
+    if node.left and node.left.max_end > node.max_end:
+        node.max_end = node.left.max_end
+    if node.right and node.right.max_end > node.max_end:
+        node.max_end = node.right.max_end
+    return node
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    _update(node)
+    return _update(pivot)
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    _update(node)
+    return _update(pivot)
+
+def _rebalance(node: _Node) -> _Node:
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+def _key(booking: Booking) -> Tuple[datetime, str]:
+    return (booking.start, booking.event_id)
+
+class IntervalTree:
+    """Self-balancing interval tree keyed by (start, event_id), augmented with subtree max end"""
+
+    def __init__(self):
+        self._root: Optional[_Node] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, booking: Booking):
+        self._root = self._insert(self._root, booking)
+        self._size += 1
+
+    def _insert(self, node: Optional[_Node], booking: Booking) -> _Node:
+        if node is None:
+            return _Node(booking)
+        if _key(booking) < _key(node.booking):
+            node.left = self._insert(node.left, booking)
+        else:
+            node.right = self._insert(node.right, booking)
+        return _rebalance(node)
+
+    def remove(self, booking: Booking) -> bool:
+        size = self._size
+        self._root = self._remove(self._root, booking)
+        return self._size < size
+
+    def _remove(self, node: Optional[_Node], booking: Booking) -> Optional[_Node]:
+        if node is None:
+            return None
+        key = _key(booking)
+        if key < _key(node.booking):
+            node.left = self._remove(node.left, booking)
+        elif key > _key(node.booking):
+            node.right = self._remove(node.right, booking)
+        else:
+            self._size -= 1
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            successor = node.right
+            while successor.left:
+                successor = successor.left
+            node.booking = successor.booking
+            self._size += 1  # the successor removal below decrements again
+            node.right = self._remove(node.right, successor.booking)
+        return _rebalance(node)
+
+    def overlapping(self, start: datetime, end: datetime) -> Iterator[Booking]:
+        """Bookings intersecting [start, end), in start order"""
+        stack: List[_Node] = []
+        node = self._root
+        while stack or node:
+            # Subtrees that end before `start` cannot overlap
+            while node and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.booking.start >= end:
+                return
+            if node.booking.end > start:
+                yield node.booking
+            node = node.right
+
+    def first_gap(self, start: datetime, end: datetime, duration: timedelta) -> Optional[datetime]:
+        """Earliest time in [start, end) with `duration` of free time, or None"""
+        cursor = start
+        for booking in self.overlapping(start, end):
+            if booking.start - cursor >= duration:
+                return cursor
+            if booking.end > cursor:
+                cursor = booking.end
+        return cursor if end - cursor >= duration else None
+
+    def __iter__(self) -> Iterator[Booking]:
+        return self.overlapping(datetime.min, datetime.max)
+
+# =============================================================================
+# CALENDAR ENGINE
+# =============================================================================
+
+@dataclass
+class SlotSuggestion:
+    """An open slot for a technician"""
+    technician_id: str
+    start: datetime
+    end: datetime
+
+class CalendarEngine:
+    """In-memory team calendar with skill/building indexes and slot search"""
+
+    def __init__(self, work_day_start: dt_time = dt_time(8, 0), work_day_end: dt_time = dt_time(17, 0),
+                 work_days: Tuple[int, ...] = (0, 1, 2, 3, 4)):
+        self.work_day_start = work_day_start
+        self.work_day_end = work_day_end
+        self.work_days = set(work_days)
+        self.trees: Dict[str, IntervalTree] = {}
+        self.skill_index: Dict[str, Set[str]] = {}
+        self.building_index: Dict[str, Set[str]] = {}
+        self.unrestricted: Set[str] = set()
+        self._events: Dict[str, Tuple[str, Booking]] = {}
+        self.synced_until: Optional[datetime] = None
+
+    def register_technician(self, technician_id: str, skills: List[str],
+                            buildings: Optional[List[str]] = None):
+        """Index a technician by skill and covered buildings (None covers every building)"""
+        self.trees.setdefault(technician_id, IntervalTree())
+        for skill in skills:
+            self.skill_index.setdefault(skill, set()).add(technician_id)
+        if buildings:
+            for building in buildings:
+                self.building_index.setdefault(building, set()).add(technician_id)
+        else:
+            self.unrestricted.add(technician_id)
+
+    def book(self, technician_id: str, start: datetime, end: datetime, event_id: str,
+             work_order_id: Optional[str] = None):
+        """Add or replace a booking, keyed by calendar event ID"""
+        self.cancel(event_id)
+        booking = Booking(start, end, event_id, work_order_id)
+        self.trees.setdefault(technician_id, IntervalTree()).insert(booking)
+        self._events[event_id] = (technician_id, booking)
+
+    def reserve(self, technician_id: str, duration_hours: float, not_before: datetime, event_id: str,
+                work_order_id: Optional[str] = None, horizon_days: int = 14) -> Optional[datetime]:
+        """Book committed work without a calendar time into the technician's earliest working-hours gap"""
+        self.cancel(event_id)
+        duration = timedelta(hours=duration_hours)
+        start = self.earliest_slot_for(technician_id, duration, not_before, not_before + timedelta(days=horizon_days))
+        if start is not None:
+            self.book(technician_id, start, start + duration, event_id, work_order_id)
+        return start
+
+    def cancel(self, event_id: str) -> bool:
+        existing = self._events.pop(event_id, None)
+        if existing is None:
+            return False
+        technician_id, booking = existing
+        return self.trees[technician_id].remove(booking)
+
+    def candidates(self, skill: Optional[str] = None, building: Optional[str] = None) -> Set[str]:
+        """Technicians with `skill` who cover `building`"""
+        technicians = set(self.trees) if skill is None else set(self.skill_index.get(skill, ()))
+        if building is not None:
+            technicians &= self.unrestricted | self.building_index.get(building, set())
+        return technicians
+
+    def _working_windows(self, start: datetime, end: datetime) -> Iterator[Tuple[datetime, datetime]]:
+        day = start.date()
+        while day <= end.date():
+            if day.weekday() in self.work_days:
+                window_start = max(start, datetime.combine(day, self.work_day_start))
+                window_end = min(end, datetime.combine(day, self.work_day_end))
+                if window_start < window_end:
+                    yield window_start, window_end
+            day += timedelta(days=1)
+
+    def earliest_slot_for(self, technician_id: str, duration: timedelta, not_before: datetime,
+                          deadline: datetime, working_hours_only: bool = True) -> Optional[datetime]:
+        """Earliest start for one technician that finishes by `deadline`"""
+        tree = self.trees.get(technician_id)
+        if tree is None:
+            return None
+        windows = (self._working_windows(not_before, deadline) if working_hours_only
+                   else iter([(not_before, deadline)]))
+        for window_start, window_end in windows:
+            slot = tree.first_gap(window_start, window_end, duration)
+            if slot is not None:
+                return slot
+        return None
+
+    def find_earliest_slots(self, duration_hours: float, deadline: datetime, skill: Optional[str] = None,
+                            building: Optional[str] = None, not_before: Optional[datetime] = None,
+                            working_hours_only: bool = True, limit: int = 3) -> List[SlotSuggestion]:
+        """Earliest open slots across all matching technicians, best first"""
+        not_before = not_before or datetime.now()
+        duration = timedelta(hours=duration_hours)
+        suggestions = []
+        for technician_id in self.candidates(skill, building):
+            slot = self.earliest_slot_for(technician_id, duration, not_before, deadline, working_hours_only)
+            if slot is not None:
+                suggestions.append(SlotSuggestion(technician_id, slot, slot + duration))
+        suggestions.sort(key=lambda s: (s.start, s.technician_id))
+        return suggestions[:limit]
+
+    # -------------------------------------------------------------------------
+    # Calendar synchronisation
+    # -------------------------------------------------------------------------
+
+    async def sync_from(self, calendar_agent: Any) -> int:
+        """Apply events changed since the last sync; returns the number of events applied
+
+        Expects `calendar_agent.list_events(technician_id=..., updated_since=...)` to return
+        dicts with `event_id`, `start`, `end`, optional `status` ("cancelled" removes the
+        booking), `updated` and `work_order_id`.
+        """
+        sync_started = datetime.now()
+        applied = 0
+        for technician_id in list(self.trees):
+            events = calendar_agent.list_events(technician_id=technician_id, updated_since=self.synced_until)
+            if inspect.isawaitable(events):
+                events = await events
+            for event in events or []:
+                if event.get("status") == "cancelled":
+                    self.cancel(event["event_id"])
+                else:
+                    self.book(
+                        technician_id,
+                        _as_datetime(event["start"]),
+                        _as_datetime(event["end"]),
+                        event["event_id"],
+                        event.get("work_order_id")
+                    )
+                applied += 1
+        self.synced_until = sync_started
+        return applied
+
+def _as_datetime(value: Any) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
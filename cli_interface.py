@@ -16,6 +16,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
+import aiohttp
 import typer
 import rich
 from rich.console import Console
@@ -37,6 +38,38 @@ from main import (
     TechnicianAvailability,
     VendorRequest
 )
+from calendar_engine import CalendarEngine, infer_required_skill
+from vendor_fanout import (
+    StubVendorBehaviour,
+    StubVendorEndpoint,
+    VendorEndpointClient,
+    VendorRegistry,
+    fan_out,
+    quote_to_response
+)
+from route_planner import BuildingRegistry, Stop, evaluate_route, plan_route
+from work_order_store import benchmark_memory
+from archive_compaction import WorkOrderArchive, compact, created_or_closed_on, run_compaction_loop
+from voice_ingest import (
+    EmergencyScreen,
+    VoiceCheckpoints,
+    VoiceWatcher,
+    WhisperTranscriber
+)
+from pm_recurrence import (
+    PMLedger,
+    batched,
+    due_between,
+    load_assets,
+    parse_horizon,
+    schedules_from_config
+)
+from sms_dispatcher import (
+    DurableOutbox,
+    HTTPGatewayTransport,
+    SMSDispatcher,
+    benchmark_throughput
+)
 
 # Initialize Rich console for beautiful output
 console = Console()
@@ -46,9 +79,19 @@ app = typer.Typer(
     add_completion=False
 )
 
+pm_app = typer.Typer(help="🗓️ Preventive maintenance schedules")
+app.add_typer(pm_app, name="pm")
+archive_app = typer.Typer(help="🗄️ Work order archive and retention")
+app.add_typer(archive_app, name="archive")
+
+CONFIG_PATH = Path(__file__).parent / "config_rules.json"
+
 # Global coordinator instance
 coordinator: Optional[MaintenanceCoordinator] = None
 
+# Local team calendar, built on first use from the coordinator's technicians
+calendar_engine: Optional[CalendarEngine] = None
+
 # =============================================================================
 # INITIALIZATION & SETUP
 # =============================================================================
@@ -126,6 +169,37 @@ async def load_sample_technicians(coord: MaintenanceCoordinator):
     for tech_data in technicians_data:
         coord.technicians[tech_data["technician_id"]] = TechnicianAvailability(**tech_data)
 
+async def get_calendar_engine(coord: MaintenanceCoordinator) -> CalendarEngine:
+    """Build the local calendar engine once, then incrementally sync it from the CalendarAgent"""
+    global calendar_engine
+    
+    if calendar_engine is None:
+        with open(CONFIG_PATH, 'r') as f:
+            coverage = json.load(f)["technician_management"]["building_coverage"]["technicians"]
+        calendar_engine = CalendarEngine()
+        for tech in coord.technicians.values():
+            calendar_engine.register_technician(tech.technician_id, tech.skills, coverage.get(tech.technician_id))
+    
+    calendar_agent = getattr(coord, "calendar_agent", None)
+    if calendar_agent is not None and hasattr(calendar_agent, "list_events"):
+        await calendar_engine.sync_from(calendar_agent)
+        return calendar_engine
+    
+    # Without event listing, committed work orders are the only record of booked time
+    console.print("⚠️ CalendarAgent cannot list events; booking time from assigned work orders instead",
+                  style="yellow")
+    now = datetime.now()
+    committed = sorted(
+        (wo for wo in coord.work_orders.values()
+         if wo.assigned_technician and wo.status.current in ("scheduled", "in_progress", "waiting_access")),
+        key=lambda wo: (wo.status.current != "in_progress", wo.priority.level != "emergency", wo.created_at)
+    )
+    for wo in committed:
+        calendar_engine.reserve(wo.assigned_technician, wo.estimated_duration_hours, now,
+                                f"work-order:{wo.id}", wo.id)
+    
+    return calendar_engine
+
 # =============================================================================
 # WORK ORDER MANAGEMENT COMMANDS
 # =============================================================================
@@ -226,6 +300,157 @@ async def update_work_order_status(
     except Exception as e:
         console.print(f"❌ Error updating status: {e}", style="red")
 
+@app.command("schedule")
+async def suggest_schedule(
+    suggest: str = typer.Option(..., "--suggest", help="Work order ID to find slots for"),
+    skill: Optional[str] = typer.Option(None, "--skill", help="Required skill (inferred from description if omitted)"),
+    deadline: Optional[str] = typer.Option(None, "--deadline", help="Latest finish time (ISO format)"),
+    limit: int = typer.Option(3, "--limit", "-l", help="Number of suggestions to show")
+):
+    """Suggest the earliest open technician slots for a work order"""
+    coord = await initialize_system()
+    
+    if suggest not in coord.work_orders:
+        console.print(f"❌ Work order {suggest} not found", style="red")
+        return
+    
+    wo = coord.work_orders[suggest]
+    required_skill = skill or infer_required_skill(f"{wo.title} {wo.description}")
+    if deadline:
+        finish_by = datetime.fromisoformat(deadline)
+    else:
+        finish_by = max(wo.created_at + timedelta(hours=wo.priority.response_time_hours),
+                        datetime.now() + timedelta(hours=wo.estimated_duration_hours))
+    
+    console.print(f"📅 Finding {wo.estimated_duration_hours}h slots for {suggest} "
+                  f"(skill: {required_skill}, by {finish_by.strftime('%Y-%m-%d %H:%M')})")
+    
+    try:
+        engine = await get_calendar_engine(coord)
+        slots = engine.find_earliest_slots(
+            wo.estimated_duration_hours,
+            finish_by,
+            skill=required_skill,
+            building=wo.building,
+            working_hours_only=wo.priority.level != "emergency",
+            limit=limit
+        )
+    except Exception as e:
+        console.print(f"❌ Error searching calendar: {e}", style="red")
+        return
+    
+    if not slots:
+        console.print("⚠️ No technician has an open slot before the deadline", style="yellow")
+        return
+    
+    slot_table = Table(title=f"Suggested Slots for {suggest}")
+    slot_table.add_column("Technician", style="cyan")
+    slot_table.add_column("Start", style="green")
+    slot_table.add_column("End", style="white")
+    
+    for slot in slots:
+        tech = coord.technicians.get(slot.technician_id)
+        slot_table.add_row(
+            tech.name if tech else slot.technician_id,
+            slot.start.strftime('%Y-%m-%d %H:%M'),
+            slot.end.strftime('%Y-%m-%d %H:%M')
+        )
+    
+    console.print(slot_table)
+
+@app.command("plan")
+async def plan_technician_day(
+    tech: str = typer.Option(..., "--tech", "-t", help="Technician ID"),
+    date: Optional[str] = typer.Option(None, "--date", "-d", help="Date to plan (YYYY-MM-DD)"),
+    buildings: Optional[str] = typer.Option(None, "--buildings",
+                                            help="Building coordinates JSON file (default: building_registry in config_rules.json)"),
+    day_start: str = typer.Option("08:00", "--start", help="Start of the working day (HH:MM)"),
+    day_end: str = typer.Option("17:00", "--end", help="End of the working day (HH:MM)")
+):
+    """Order a technician's work orders booked for one day to minimise travel between buildings"""
+    coord = await initialize_system()
+    
+    if tech not in coord.technicians:
+        console.print(f"❌ Technician {tech} not found", style="red")
+        return
+    if buildings and not Path(buildings).exists():
+        console.print(f"❌ Building coordinates file {buildings} does not exist", style="red")
+        return
+    
+    technician = coord.technicians[tech]
+    plan_date = datetime.fromisoformat(date).date() if date else datetime.now().date()
+    start = datetime.combine(plan_date, datetime.strptime(day_start, "%H:%M").time())
+    end = datetime.combine(plan_date, datetime.strptime(day_end, "%H:%M").time())
+    if plan_date == datetime.now().date():
+        start = max(start, datetime.now().replace(second=0, microsecond=0))
+    
+    # Work orders carry no visit date, so the calendar decides which ones fall on this day
+    engine = await get_calendar_engine(coord)
+    tree = engine.trees.get(tech)
+    booked_today = {
+        booking.work_order_id
+        for booking in (tree.overlapping(datetime.combine(plan_date, datetime.min.time()),
+                                         datetime.combine(plan_date + timedelta(days=1), datetime.min.time()))
+                        if tree else ())
+    }
+    
+    stops = [
+        Stop(
+            work_order_id=wo.id,
+            building=wo.building,
+            duration_hours=wo.estimated_duration_hours,
+            deadline=wo.created_at + timedelta(hours=wo.priority.response_time_hours),
+            emergency=wo.priority.level == "emergency"
+        )
+        for wo in coord.work_orders.values()
+        if wo.assigned_technician == tech and wo.status.current in ("scheduled", "in_progress", "waiting_access")
+        and wo.id in booked_today
+    ]
+    if not stops:
+        console.print(f"📋 No work orders booked for {technician.name} on {plan_date.isoformat()}", style="yellow")
+        return
+    
+    if buildings:
+        registry = BuildingRegistry.from_file(buildings)
+    else:
+        with open(CONFIG_PATH, 'r') as f:
+            registry = BuildingRegistry.from_config(json.load(f))
+    plan = plan_route(stops, registry, technician.current_location, start, end)
+    planned_ids = {planned.stop.work_order_id for planned in plan.stops}
+    unplanned = evaluate_route([s for s in stops if s.work_order_id in planned_ids], registry,
+                               technician.current_location, start)
+    
+    plan_table = Table(title=f"Route for {technician.name} - {start.strftime('%Y-%m-%d')}")
+    plan_table.add_column("#", style="cyan")
+    plan_table.add_column("Work Order", style="white")
+    plan_table.add_column("Building", style="green")
+    plan_table.add_column("Travel", style="blue")
+    plan_table.add_column("Arrive", style="yellow")
+    plan_table.add_column("Done", style="yellow")
+    plan_table.add_column("Deadline", style="red")
+    
+    for number, planned in enumerate(plan.stops, start=1):
+        deadline_display = planned.stop.deadline.strftime('%m-%d %H:%M') if planned.stop.deadline else "-"
+        if planned.late:
+            deadline_display = f"⚠️ {deadline_display}"
+        plan_table.add_row(
+            str(number),
+            planned.stop.work_order_id + (" 🚨" if planned.stop.emergency else ""),
+            planned.stop.building,
+            f"{planned.travel_minutes:.0f} min",
+            planned.arrival.strftime('%H:%M'),
+            planned.departure.strftime('%H:%M'),
+            deadline_display
+        )
+    
+    console.print(plan_table)
+    console.print(f"🚗 Travel: {plan.travel_minutes:.0f} min (vs {unplanned.travel_minutes:.0f} min unordered)")
+    if plan.lateness_minutes:
+        console.print(f"⚠️ {plan.lateness_minutes:.0f} min past deadlines across the route", style="yellow")
+    if plan.deferred:
+        console.print(f"⏭️ Deferred past {end.strftime('%H:%M')}: "
+                      f"{', '.join(stop.work_order_id for stop in plan.deferred)}", style="yellow")
+
 # =============================================================================
 # COORDINATION DASHBOARD COMMANDS
 # =============================================================================
@@ -469,6 +694,75 @@ async def process_voice_batch(
     
     console.print(f"✅ Processed {processed_count} files, created {created_count} work orders", style="green")
 
+@app.command("voice-watch")
+async def watch_voice_directory(
+    directory: str = typer.Argument(..., help="Drop directory to watch for recordings"),
+    file_pattern: str = typer.Option("*.wav", "--pattern", "-p", help="File pattern to match"),
+    whisper_model: Optional[str] = typer.Option(None, "--whisper-model", help="Transcribe locally with this Whisper model"),
+    checkpoint_db: str = typer.Option("voice_checkpoints.db", "--checkpoints", help="Checkpoint database path"),
+    auto_create: bool = typer.Option(True, "--auto-create/--no-auto-create", help="Auto-create high-confidence work orders")
+):
+    """Watch a directory and process voicemails as they arrive (emergencies first)"""
+    coord = await initialize_system()
+    
+    voice_dir = Path(directory)
+    if not voice_dir.is_dir():
+        console.print(f"❌ Directory {directory} does not exist", style="red")
+        return
+    
+    with open(CONFIG_PATH, 'r') as f:
+        screen = EmergencyScreen.from_config(json.load(f))
+    
+    async def extract(transcript: str) -> Dict[str, Any]:
+        voice_result = await voice_agent.run(f"Process voice input: {transcript}", deps=coord)
+        return voice_result.data
+    
+    async def on_result(result):
+        if "error" in result.extraction:
+            if result.emergency:
+                console.print(f"🚨 EMERGENCY in {result.path.name} ({', '.join(result.emergency_keywords)}) could not "
+                              f"be processed: {result.extraction['error']}. Coordinator review required.",
+                              style="bold red")
+            else:
+                console.print(f"⚠️ Error processing {result.path.name}: {result.extraction['error']}", style="yellow")
+            return
+        
+        voice_data = result.extraction
+        if result.emergency:
+            console.print(f"🚨 EMERGENCY in {result.path.name}: {', '.join(result.emergency_keywords)}", style="bold red")
+        else:
+            console.print(f"🎤 Processed {result.path.name} ({voice_data.get('confidence', 0):.0%} confidence)")
+        
+        # Emergencies are always raised; routine messages need high confidence
+        if auto_create and voice_data.get("building") and voice_data.get("description") and (
+                result.emergency or voice_data.get("confidence", 0) > 0.8):
+            created = await coordination_agent.run(
+                f"Create work order for '{voice_data['description']}' in building {voice_data['building']}" +
+                (f" unit {voice_data['unit']}" if voice_data.get('unit') else "") +
+                (" with emergency priority" if result.emergency else ""),
+                deps=coord
+            )
+            console.print(f"✅ {created.data}", style="green")
+        elif result.emergency:
+            console.print("⚠️ Emergency is missing building or description. Coordinator review required.", style="red")
+    
+    checkpoints = VoiceCheckpoints(checkpoint_db)
+    watcher = VoiceWatcher(
+        directory,
+        extract,
+        on_result,
+        screen,
+        checkpoints,
+        transcriber=WhisperTranscriber(whisper_model) if whisper_model else None,
+        file_pattern=file_pattern
+    )
+    
+    console.print(f"👂 Watching {voice_dir.resolve()} for {file_pattern} (Ctrl+C to stop)", style="bold")
+    try:
+        await watcher.run()
+    finally:
+        checkpoints.close()
+
 # =============================================================================
 # VENDOR MANAGEMENT COMMANDS
 # =============================================================================
@@ -478,7 +772,9 @@ async def create_vendor_request(
     work_order_id: str = typer.Argument(..., help="Work order ID"),
     category: str = typer.Option(..., "--category", "-c", help="Vendor category"),
     skills: str = typer.Option(..., "--skills", "-s", help="Required skills (comma-separated)"),
-    budget: Optional[float] = typer.Option(None, "--budget", "-b", help="Maximum budget")
+    budget: Optional[float] = typer.Option(None, "--budget", "-b", help="Maximum budget"),
+    fan_out_to: Optional[str] = typer.Option(None, "--fan-out", help="Vendor registry JSON file to send the request to"),
+    wait: float = typer.Option(60.0, "--wait", "-w", help="Maximum seconds to collect responses")
 ):
     """Create vendor request for specialized work"""
     coord = await initialize_system()
@@ -499,6 +795,101 @@ async def create_vendor_request(
         
     except Exception as e:
         console.print(f"❌ Error creating vendor request: {e}", style="red")
+        return
+    
+    if fan_out_to:
+        vendor_request = next(
+            (req for req in reversed(list(coord.vendor_requests.values())) if req.work_order_id == work_order_id),
+            None
+        )
+        if vendor_request is None:
+            console.print(f"❌ No vendor request found for work order {work_order_id}", style="red")
+            return
+        await collect_vendor_quotes(vendor_request, VendorRegistry.from_file(fan_out_to), wait)
+
+async def collect_vendor_quotes(vendor_request: VendorRequest, registry: VendorRegistry, wait: float):
+    """Send a vendor request to every matching vendor and rank the quotes as they arrive"""
+    vendors = [
+        vendor for vendor in registry.match(
+            vendor_request.vendor_category,
+            vendor_request.specialties_required,
+            vendor_request.max_budget
+        )
+        if vendor.endpoint
+    ]
+    if not vendors:
+        console.print("⚠️ No registered vendors match this request", style="yellow")
+        return
+    
+    deadline = min(vendor_request.response_deadline, datetime.now() + timedelta(seconds=wait))
+    console.print(f"📨 Sending request {vendor_request.request_id} to {len(vendors)} vendors "
+                  f"(collecting until {deadline.strftime('%H:%M:%S')})")
+    
+    def on_response(quote, rank):
+        console.print(f"  💬 {quote.vendor_id} quoted ${quote.quote_amount:,.2f} "
+                      f"(score {quote.score:.2f}, rank #{rank + 1})")
+    
+    payload = {
+        "request_id": vendor_request.request_id,
+        "work_order_id": vendor_request.work_order_id,
+        "category": vendor_request.vendor_category,
+        "specialties": vendor_request.specialties_required,
+        "max_budget": vendor_request.max_budget,
+        "response_deadline": vendor_request.response_deadline.isoformat()
+    }
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=wait)) as session:
+        ranked = await fan_out(
+            payload,
+            vendors,
+            deadline,
+            VendorEndpointClient(session).request_quote,
+            max_budget=vendor_request.max_budget,
+            on_response=on_response
+        )
+    
+    vendor_request.vendor_responses.extend(quote_to_response(quote) for quote in ranked.quotes)
+    
+    ranking_table = Table(title=f"Vendor Quotes for {vendor_request.request_id}")
+    ranking_table.add_column("Rank", style="cyan")
+    ranking_table.add_column("Vendor", style="white")
+    ranking_table.add_column("Quote", style="green")
+    ranking_table.add_column("Earliest Start", style="yellow")
+    ranking_table.add_column("Score", style="blue")
+    
+    for rank, quote in enumerate(ranked.quotes, start=1):
+        ranking_table.add_row(
+            str(rank),
+            registry.vendors[quote.vendor_id].name,
+            f"${quote.quote_amount:,.2f}",
+            quote.earliest_start.strftime('%Y-%m-%d %H:%M'),
+            f"{quote.score:.2f}"
+        )
+    
+    console.print(ranking_table)
+    if ranked.failures or ranked.timed_out:
+        console.print(f"⚠️ {len(ranked.failures)} vendors failed, {len(ranked.timed_out)} did not respond in time",
+                      style="yellow")
+
+@app.command("vendor-stub")
+async def run_vendor_stub(
+    port: int = typer.Option(8081, "--port", help="Port to listen on"),
+    latency: float = typer.Option(0.5, "--latency", help="Base response latency (seconds)"),
+    jitter: float = typer.Option(0.5, "--jitter", help="Additional random latency (seconds)"),
+    failure_rate: float = typer.Option(0.1, "--failure-rate", help="Fraction of requests that fail (0-1)")
+):
+    """Run a local stub vendor endpoint for exercising vendor fan-out"""
+    stub = StubVendorEndpoint(
+        StubVendorBehaviour(latency_seconds=latency, latency_jitter_seconds=jitter, failure_rate=failure_rate),
+        port=port
+    )
+    url = await stub.start()
+    console.print(f"🧪 Stub vendor endpoint listening on {url}/vendors/<vendor_id> (Ctrl+C to stop)", style="bold")
+    
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await stub.stop()
 
 @app.command("vendor-responses")
 async def show_vendor_responses(
@@ -539,6 +930,198 @@ async def show_vendor_responses(
         else:
             console.print("📋 No vendor requests found", style="yellow")
 
+# =============================================================================
+# NOTIFICATION DISPATCH COMMANDS
+# =============================================================================
+
+@app.command("outbox")
+async def show_sms_outbox(
+    path: str = typer.Option("sms_outbox.db", "--path", help="Outbox database path"),
+    flush_to: Optional[str] = typer.Option(None, "--flush-to", help="Gateway URL to drain pending messages to"),
+    rate: float = typer.Option(30.0, "--rate", help="Maximum sends per second")
+):
+    """Show outbound SMS queue status and optionally drain it"""
+    outbox = DurableOutbox(path)
+
+    try:
+        if flush_to:
+            transport = HTTPGatewayTransport(flush_to)
+            dispatcher = SMSDispatcher(transport, outbox, rate_per_second=rate)
+            console.print(f"📤 Draining outbox to {flush_to}...")
+            try:
+                await dispatcher.drain()
+            finally:
+                await transport.close()
+            console.print(f"✅ Sent {dispatcher.stats['sent']} messages "
+                          f"({dispatcher.stats['coalesced']} coalesced, {dispatcher.stats['failed']} failed)", style="green")
+
+        counts = outbox.counts()
+        table = Table(title="SMS Outbox")
+        table.add_column("Status", style="cyan")
+        table.add_column("Messages", style="white")
+        for status in ("pending", "sent", "failed"):
+            table.add_row(status, str(counts.get(status, 0)))
+        console.print(table)
+    finally:
+        outbox.close()
+
+@app.command("sms-bench")
+async def benchmark_sms_dispatch(
+    messages: int = typer.Option(5000, "--messages", "-m", help="Number of messages to send"),
+    recipients: int = typer.Option(500, "--recipients", "-r", help="Number of distinct recipients"),
+    rate: float = typer.Option(2000.0, "--rate", help="Maximum sends per second"),
+    latency: float = typer.Option(0.005, "--latency", help="Simulated gateway latency (seconds)"),
+    failure_rate: float = typer.Option(0.0, "--failure-rate", help="Simulated gateway failure rate (0-1)")
+):
+    """Benchmark SMS dispatch throughput against the local stand-in gateway"""
+    console.print(f"⏱️ Dispatching {messages} messages to {recipients} recipients...")
+
+    result = await benchmark_throughput(
+        message_count=messages,
+        recipient_count=recipients,
+        rate_per_second=rate,
+        latency_seconds=latency,
+        failure_rate=failure_rate
+    )
+
+    table = Table(title="SMS Dispatch Benchmark")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", style="white")
+    table.add_row("Messages", str(result["messages"]))
+    table.add_row("Provider Sends", str(result["provider_sends"]))
+    table.add_row("Retries", str(result["stats"]["retried"]))
+    table.add_row("Failed", str(result["stats"]["failed"]))
+    table.add_row("Elapsed", f"{result['elapsed_seconds']:.2f}s")
+    table.add_row("Throughput", f"{result['messages_per_second']:.0f} msgs/sec")
+    console.print(table)
+
+# =============================================================================
+# PREVENTIVE MAINTENANCE COMMANDS
+# =============================================================================
+
+def load_pm_schedules(assets_file: str):
+    """Build preventive maintenance schedules from config rules and the asset register"""
+    with open(CONFIG_PATH, 'r') as f:
+        config = json.load(f)
+    return schedules_from_config(config, load_assets(assets_file))
+
+@pm_app.command("due")
+async def show_pm_due(
+    days: int = typer.Option(30, "--days", "-d", help="Look-ahead window in days"),
+    assets: str = typer.Option("pm_assets.json", "--assets", "-a", help="Asset register JSON file")
+):
+    """Show preventive maintenance due in the next N days"""
+    if not Path(assets).exists():
+        console.print(f"❌ Asset register {assets} does not exist", style="red")
+        return
+    
+    try:
+        schedules = load_pm_schedules(assets)
+    except ValueError as e:
+        console.print(f"❌ Invalid asset register: {e}", style="red")
+        return
+    today = datetime.now().date()
+    
+    pm_table = Table(title=f"Preventive Maintenance Due (next {days} days)")
+    pm_table.add_column("Due", style="cyan")
+    pm_table.add_column("Task", style="white")
+    pm_table.add_column("Asset", style="yellow")
+    pm_table.add_column("Location", style="green")
+    
+    for occurrence in due_between(schedules, today, today + timedelta(days=days)):
+        schedule = occurrence.schedule
+        pm_table.add_row(
+            occurrence.due.isoformat(),
+            schedule.task.replace("_", " "),
+            schedule.asset_id,
+            f"{schedule.building}{' · ' + schedule.unit if schedule.unit else ''}"
+        )
+    
+    if pm_table.row_count:
+        console.print(pm_table)
+    else:
+        console.print("✨ No preventive maintenance due", style="green")
+
+@pm_app.command("generate")
+async def generate_pm_work_orders(
+    horizon: str = typer.Option("30d", "--horizon", help="How far ahead to generate (e.g. 30d, 6w)"),
+    assets: str = typer.Option("pm_assets.json", "--assets", "-a", help="Asset register JSON file"),
+    ledger_path: str = typer.Option("pm_ledger.db", "--ledger", help="Generation ledger database"),
+    since: Optional[str] = typer.Option(None, "--since",
+                                        help="Generate from this date (YYYY-MM-DD) instead of where the last run stopped"),
+    batch_size: int = typer.Option(20, "--batch-size", help="Work orders created concurrently per batch"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Show what would be created")
+):
+    """Create work orders for upcoming preventive maintenance (safe to re-run, catches up missed runs)"""
+    coord = await initialize_system()
+    
+    if not Path(assets).exists():
+        console.print(f"❌ Asset register {assets} does not exist", style="red")
+        return
+    
+    today = datetime.now().date()
+    try:
+        schedules = load_pm_schedules(assets)
+        window_end = today + parse_horizon(horizon)
+        since_date = datetime.fromisoformat(since).date() if since else None
+    except ValueError as e:
+        console.print(f"❌ {e}", style="red")
+        return
+    ledger = PMLedger(ledger_path)
+    # Resume where the last run stopped so occurrences that fell due during a missed run
+    # are still generated; the ledger filters out anything already created
+    window_start = since_date or min(today, ledger.generated_through() or today)
+    if window_start < today:
+        console.print(f"⏪ Catching up on occurrences due since {window_start.isoformat()}", style="dim")
+    
+    async def create_pm_work_order(occurrence):
+        schedule = occurrence.schedule
+        description = (f"Preventive maintenance: {schedule.task.replace('_', ' ')} for asset "
+                       f"{schedule.asset_id}, due {occurrence.due.isoformat()}")
+        if schedule.notes:
+            description += f" ({', '.join(schedule.notes)})"
+        await coordination_agent.run(
+            f"Create work order for '{description}' in building {schedule.building}" +
+            (f" unit {schedule.unit}" if schedule.unit else "") +
+            f" with low priority, reference {occurrence.key}",
+            deps=coord
+        )
+        return occurrence.key
+    
+    created_count = 0
+    skipped_count = 0
+    first_failed = None
+    try:
+        for batch in batched(due_between(schedules, window_start, window_end), batch_size):
+            pending = ledger.pending(batch)
+            skipped_count += len(batch) - len(pending)
+            if dry_run:
+                for occurrence in pending:
+                    console.print(f"  {occurrence.due.isoformat()}  {occurrence.key}")
+                created_count += len(pending)
+                continue
+            
+            results = await asyncio.gather(
+                *(create_pm_work_order(occurrence) for occurrence in pending),
+                return_exceptions=True
+            )
+            created = [key for key in results if isinstance(key, str)]
+            for occurrence, error in zip(pending, results):
+                if isinstance(error, Exception):
+                    console.print(f"⚠️ Error creating PM work order: {error}", style="yellow")
+                    first_failed = first_failed or occurrence.due
+            ledger.record(created)
+            created_count += len(created)
+        if not dry_run:
+            # A failed occurrence holds the mark back so the next run retries it
+            ledger.mark_generated_through(first_failed or window_end)
+    finally:
+        ledger.close()
+    
+    action = "Would create" if dry_run else "Created"
+    console.print(f"✅ {action} {created_count} PM work orders through {window_end.isoformat()} "
+                  f"({skipped_count} already generated)", style="green")
+
 # =============================================================================
 # REPORTING AND ANALYTICS COMMANDS
 # =============================================================================
@@ -546,7 +1129,8 @@ async def show_vendor_responses(
 @app.command("report")
 async def generate_daily_report(
     date: Optional[str] = typer.Option(None, "--date", "-d", help="Date (YYYY-MM-DD)"),
-    export_file: Optional[str] = typer.Option(None, "--export", "-e", help="Export to file")
+    export_file: Optional[str] = typer.Option(None, "--export", "-e", help="Export to file"),
+    archive_dir: str = typer.Option("archive", "--archive-dir", help="Work order archive directory")
 ):
     """Generate daily performance report"""
     coord = await initialize_system()
@@ -556,11 +1140,21 @@ async def generate_daily_report(
     console.print(f"📊 Daily Performance Report - {report_date.strftime('%Y-%m-%d')}", style="bold blue")
     console.print("=" * 60)
     
+    # (status, technician) for orders created or closed on the report date, live and archived alike
+    report_orders = [(wo.status.current, wo.assigned_technician) for wo in coord.work_orders.values()
+                     if created_or_closed_on(wo, report_date.date())]
+    if report_date.date() < datetime.now().date() and Path(archive_dir).exists():
+        archived = [(record["status"], record["assigned_technician"])
+                    for record in WorkOrderArchive(archive_dir).orders_on(report_date.date())]
+        if archived:
+            console.print(f"🗄️ Including {len(archived)} archived work orders", style="dim")
+        report_orders.extend(archived)
+    
     # Calculate metrics
-    total_work_orders = len(coord.work_orders)
-    completed_orders = len([wo for wo in coord.work_orders.values() if wo.status.current == "completed"])
-    pending_approval = len([wo for wo in coord.work_orders.values() if wo.status.current == "ready_review"])
-    in_progress = len([wo for wo in coord.work_orders.values() if wo.status.current == "in_progress"])
+    total_work_orders = len(report_orders)
+    completed_orders = len([status for status, _ in report_orders if status == "completed"])
+    pending_approval = len([status for status, _ in report_orders if status == "ready_review"])
+    in_progress = len([status for status, _ in report_orders if status == "in_progress"])
     
     # Create metrics table
     metrics_table = Table(title="Daily Metrics")
@@ -590,10 +1184,8 @@ async def generate_daily_report(
     tech_perf_table.add_column("Efficiency", style="blue")
     
     for tech_id, tech in coord.technicians.items():
-        completed = len([wo for wo in coord.work_orders.values() 
-                        if wo.assigned_technician == tech_id and wo.status.current == "completed"])
-        active = len([wo for wo in coord.work_orders.values() 
-                     if wo.assigned_technician == tech_id and wo.status.current == "in_progress"])
+        completed = report_orders.count(("completed", tech_id))
+        active = report_orders.count(("in_progress", tech_id))
         efficiency = f"{(completed / max(completed + active, 1)) * 100:.1f}%"
         
         tech_perf_table.add_row(tech.name, str(completed), str(active), efficiency)
@@ -613,10 +1205,8 @@ async def generate_daily_report(
             "technician_performance": {
                 tech_id: {
                     "name": tech.name,
-                    "completed": len([wo for wo in coord.work_orders.values() 
-                                   if wo.assigned_technician == tech_id and wo.status.current == "completed"]),
-                    "in_progress": len([wo for wo in coord.work_orders.values() 
-                                      if wo.assigned_technician == tech_id and wo.status.current == "in_progress"])
+                    "completed": report_orders.count(("completed", tech_id)),
+                    "in_progress": report_orders.count(("in_progress", tech_id))
                 }
                 for tech_id, tech in coord.technicians.items()
             }
@@ -627,6 +1217,82 @@ async def generate_daily_report(
         
         console.print(f"📁 Report exported to {export_file}", style="green")
 
+@archive_app.command("compact")
+async def compact_work_orders(
+    older_than_days: Optional[int] = typer.Option(None, "--older-than", help="Archive closed orders older than N days"),
+    archive_dir: str = typer.Option("archive", "--archive-dir", help="Work order archive directory"),
+    segment_size: int = typer.Option(10_000, "--segment-size", help="Maximum work orders per segment"),
+    every: Optional[float] = typer.Option(None, "--every", help="Keep running, compacting every N hours")
+):
+    """Move old completed/cancelled work orders into compressed archive segments"""
+    coord = await initialize_system()
+    
+    with open(CONFIG_PATH, 'r') as f:
+        retention = json.load(f)["data_management"]["retention_policies"]
+    archive_after_days = (older_than_days if older_than_days is not None
+                          else retention.get("archive_closed_work_orders_after_days", 90))
+    archive = WorkOrderArchive(archive_dir)
+    compact_kwargs = {
+        "archive_after_days": archive_after_days,
+        "retention_years": retention.get("completed_work_orders_years"),
+        "segment_size": segment_size,
+    }
+    
+    def report(result):
+        console.print(f"🗄️ Archived {result.archived} work orders into {result.segments_written} segments, "
+                      f"expired {result.segments_expired} segments ({len(coord.work_orders)} active)", style="green")
+    
+    if every is None:
+        report(await asyncio.to_thread(compact, coord.work_orders, archive, **compact_kwargs))
+    else:
+        await run_compaction_loop(coord.work_orders, archive, interval_seconds=every * 3600,
+                                  on_result=report, **compact_kwargs)
+
+@archive_app.command("list")
+async def list_archive_segments(
+    archive_dir: str = typer.Option("archive", "--archive-dir", help="Work order archive directory")
+):
+    """List archive segments and their date ranges"""
+    archive = WorkOrderArchive(archive_dir)
+    
+    if not archive.segments:
+        console.print("📋 Archive is empty", style="yellow")
+        return
+    
+    segment_table = Table(title="Work Order Archive Segments")
+    segment_table.add_column("Segment", style="cyan")
+    segment_table.add_column("From", style="green")
+    segment_table.add_column("To", style="green")
+    segment_table.add_column("Work Orders", style="white")
+    
+    for segment in archive.segments:
+        segment_table.add_row(segment.segment_id, segment.min_date, segment.max_date, str(segment.count))
+    
+    console.print(segment_table)
+
+@app.command("memory-bench")
+async def benchmark_work_order_memory(
+    orders: int = typer.Option(100_000, "--orders", "-n", help="Number of work orders to hold in memory")
+):
+    """Compare peak RSS of pydantic work orders against the file-backed columnar store"""
+    console.print(f"🧮 Measuring peak memory for {orders:,} work orders...")
+    
+    with Progress(SpinnerColumn(), TextColumn("[progress.description]{task.description}"), console=console) as progress:
+        progress.add_task("Running isolated measurements...", total=None)
+        results = await asyncio.to_thread(benchmark_memory, orders)
+    
+    memory_table = Table(title=f"Peak Memory at {orders:,} Work Orders")
+    memory_table.add_column("Representation", style="cyan")
+    memory_table.add_column("Peak RSS", style="yellow")
+    
+    baseline = "Pydantic models" if results["models"]["baseline"] == "pydantic" else "Plain dicts (models unavailable)"
+    for label, result in ((baseline, results["models"]), ("Columnar store", results["store"])):
+        memory_table.add_row(label, f"{result['max_rss_mb']:.1f} MB")
+    
+    console.print(memory_table)
+    saving = 1 - results["store"]["max_rss_mb"] / results["models"]["max_rss_mb"]
+    console.print(f"📉 Peak RSS reduced by {saving:.0%}", style="green")
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
@@ -0,0 +1,319 @@
+"""
+Maintenance Operations Center - Preventive Maintenance Recurrence Engine
+
+Stores one recurrence rule per asset task and expands occurrences lazily:
+- RRULE-style rules (FREQ/INTERVAL/BYMONTH/COUNT/UNTIL) built from config_rules.json
+- Generators that jump straight to the query window instead of replaying history
+- heapq.merge across all assets for ordered "what is due next" queries
+- SQLite ledger so work order generation is idempotent across runs
+"""
+
+import calendar
+import heapq
+import json
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterator, Iterable, Tuple
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+MONTH_NAMES = {name.lower(): index for index, name in enumerate(calendar.month_name) if name}
+
+# Asset types covered by each config_rules.json recurring schedule
+SCHEDULE_ASSET_TYPES = {
+    "hvac_maintenance_months": ["hvac"],
+    "filter_replacement_months": ["hvac"],
+    "appliance_inspection_months": ["appliance"],
+    "safety_inspection_months": ["building"],
+}
+
+# =============================================================================
+# RECURRENCE RULES
+# =============================================================================
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """Subset of RFC 5545 RRULE sufficient for maintenance schedules"""
+    freq: str
+    dtstart: date
+    interval: int = 1
+    bymonth: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[date] = None
+
+    @classmethod
+    def parse(cls, rrule: str, dtstart: date) -> "RecurrenceRule":
+        """Parse e.g. 'FREQ=MONTHLY;INTERVAL=6' or 'FREQ=YEARLY;BYMONTH=10'"""
+        parts = dict(part.split("=", 1) for part in rrule.upper().replace("RRULE:", "").split(";") if part)
+        freq = parts.get("FREQ")
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unsupported recurrence frequency: {freq}")
+        return cls(
+            freq=freq,
+            dtstart=dtstart,
+            interval=int(parts.get("INTERVAL", 1)),
+            bymonth=tuple(sorted(int(m) for m in parts["BYMONTH"].split(","))) if "BYMONTH" in parts else (),
+            count=int(parts["COUNT"]) if "COUNT" in parts else None,
+            until=datetime.strptime(parts["UNTIL"][:8], "%Y%m%d").date() if "UNTIL" in parts else None,
+        )
+
+    def to_rrule(self) -> str:
+        parts = [f"FREQ={self.freq}", f"INTERVAL={self.interval}"]
+        if self.bymonth:
+            parts.append("BYMONTH=" + ",".join(str(m) for m in self.bymonth))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%d')}")
+        return ";".join(parts)
+
+    def _nth(self, n: int) -> date:
+        """Start of the n-th period (0-based) before BYMONTH filtering"""
+        if self.freq == "DAILY":
+            return self.dtstart + timedelta(days=n * self.interval)
+        if self.freq == "WEEKLY":
+            return self.dtstart + timedelta(weeks=n * self.interval)
+        if self.freq == "MONTHLY":
+            return _add_months(self.dtstart, n * self.interval)
+        return _add_months(self.dtstart, 12 * n * self.interval)
+
+    @property
+    def _yearly_bymonth(self) -> bool:
+        return self.freq == "YEARLY" and bool(self.bymonth)
+
+    def _first_period_at_or_after(self, start: date) -> int:
+        """Smallest period index that can contain `start`, computed without iteration"""
+        if start <= self.dtstart:
+            return 0
+        if self._yearly_bymonth:
+            return (start.year - self.dtstart.year) // self.interval
+        if self.freq in ("DAILY", "WEEKLY"):
+            step = self.interval * (7 if self.freq == "WEEKLY" else 1)
+            return -(-(start - self.dtstart).days // step)
+        step = self.interval * (12 if self.freq == "YEARLY" else 1)
+        months = (start.year - self.dtstart.year) * 12 + start.month - self.dtstart.month
+        n = max(0, months // step)
+        while self._nth(n) < start:
+            n += 1
+        return n
+
+    def _period(self, n: int) -> Tuple[date, List[date]]:
+        """Lower bound of the n-th period and the occurrences it produces"""
+        period_start = self._nth(n)
+        if self._yearly_bymonth:
+            # One occurrence per listed month of the year, on the anchor day
+            year = period_start.year
+            return date(year, 1, 1), [
+                date(year, month, min(self.dtstart.day, calendar.monthrange(year, month)[1]))
+                for month in self.bymonth
+            ]
+        if self.bymonth and period_start.month not in self.bymonth:
+            return period_start, []
+        return period_start, [period_start]
+
+    def between(self, start: date, end: date) -> Iterator[date]:
+        """Lazily yield occurrences in [start, end)"""
+        # COUNT needs the occurrence index, so only it forces expansion from dtstart
+        n = 0 if self.count is not None else self._first_period_at_or_after(start)
+        produced = 0
+        while True:
+            lower_bound, occurrences = self._period(n)
+            if lower_bound >= end:
+                return
+            for occurrence in occurrences:
+                if occurrence < self.dtstart:
+                    continue
+                if self.until is not None and occurrence > self.until:
+                    return
+                if self.count is not None:
+                    if produced >= self.count:
+                        return
+                    produced += 1
+                if occurrence >= end:
+                    return
+                if occurrence >= start:
+                    yield occurrence
+            n += 1
+
+# =============================================================================
+# ASSET SCHEDULES
+# =============================================================================
+
+@dataclass
+class PMSchedule:
+    """A recurring preventive maintenance task for one asset"""
+    asset_id: str
+    task: str
+    building: str
+    rule: RecurrenceRule
+    unit: Optional[str] = None
+    estimated_duration_hours: float = 1.5
+    notes: List[str] = field(default_factory=list)
+
+    def occurrence_key(self, due: date) -> str:
+        return f"PM-{self.asset_id}-{self.task}-{due.strftime('%Y%m%d')}"
+
+@dataclass(frozen=True)
+class PMOccurrence:
+    """A single due date produced by a schedule"""
+    due: date
+    key: str
+    schedule: PMSchedule = field(compare=False)
+
+def _season_months(season: str) -> Tuple[int, ...]:
+    return tuple(MONTH_NAMES[name] for name in season.lower().split("_") if name in MONTH_NAMES)
+
+def schedules_from_config(config: Dict[str, Any], assets: Iterable[Dict[str, Any]]) -> List[PMSchedule]:
+    """Build per-asset schedules from `preventive_maintenance` in config_rules.json
+
+    Each asset is a dict with `asset_id`, `asset_type`, `building`, optional `unit`,
+    `installed_on` (ISO date, anchors the recurrence) and optional `rrules` overrides
+    mapping task name to an RRULE string. `installed_on` is required: occurrence keys
+    derive from it, so a moving anchor would break idempotent generation.
+    """
+    pm_config = config.get("preventive_maintenance", {})
+    recurring = pm_config.get("recurring_schedules", {})
+    boiler = pm_config.get("boiler_maintenance", {})
+
+    schedules = []
+    for asset in assets:
+        if not asset.get("installed_on"):
+            raise ValueError(f"Asset {asset['asset_id']} has no installed_on date to anchor its schedules")
+        anchor = date.fromisoformat(asset["installed_on"])
+        overrides = asset.get("rrules", {})
+
+        def add(task: str, rule: RecurrenceRule):
+            if task in overrides:
+                rule = RecurrenceRule.parse(overrides[task], anchor)
+            schedules.append(PMSchedule(
+                asset_id=asset["asset_id"],
+                task=task,
+                building=asset["building"],
+                unit=asset.get("unit"),
+                rule=rule,
+                estimated_duration_hours=asset.get("estimated_duration_hours", 1.5)
+            ))
+
+        for setting, months in recurring.items():
+            if asset["asset_type"] in SCHEDULE_ASSET_TYPES.get(setting, []):
+                add(setting.replace("_months", ""), RecurrenceRule("MONTHLY", anchor, interval=months))
+
+        if asset["asset_type"] == "boiler" and boiler.get("annual_requirement"):
+            season = _season_months(boiler.get("season_preparation", "")) or (anchor.month,)
+            # Annual service in the first month of the preparation season
+            rule = RecurrenceRule("YEARLY", anchor.replace(day=1), bymonth=season[:1])
+            add("boiler_maintenance", rule)
+            steps = [key for key in ("drainage_required", "anode_rod_replacement") if boiler.get(key)]
+            schedules[-1].notes.extend(step.replace("_", " ") for step in steps)
+
+        for task, rrule in overrides.items():
+            if not any(s.asset_id == asset["asset_id"] and s.task == task for s in schedules):
+                add(task, RecurrenceRule.parse(rrule, anchor))
+
+    return schedules
+
+def load_assets(path: str) -> List[Dict[str, Any]]:
+    """Read the asset register (a JSON list of asset dicts)"""
+    with open(path, "r") as f:
+        return json.load(f)
+
+# =============================================================================
+# DUE QUERIES
+# =============================================================================
+
+def _occurrences(schedule: PMSchedule, start: date, end: date) -> Iterator[PMOccurrence]:
+    for due in schedule.rule.between(start, end):
+        yield PMOccurrence(due, schedule.occurrence_key(due), schedule)
+
+def due_between(schedules: Iterable[PMSchedule], start: date, end: date) -> Iterator[PMOccurrence]:
+    """All occurrences in [start, end), merged in due-date order without materializing them"""
+    return heapq.merge(
+        *(_occurrences(schedule, start, end) for schedule in schedules),
+        key=lambda occurrence: (occurrence.due, occurrence.key)
+    )
+
+def due_within_days(schedules: Iterable[PMSchedule], days: int, today: Optional[date] = None) -> Iterator[PMOccurrence]:
+    today = today or date.today()
+    return due_between(schedules, today, today + timedelta(days=days))
+
+def parse_horizon(value: str) -> timedelta:
+    """Parse a horizon such as '30d' or '6w' (bare numbers are days)"""
+    match = re.fullmatch(r"\s*(\d+)\s*([dw]?)\s*", value.lower())
+    if not match:
+        raise ValueError(f"Invalid horizon '{value}', expected e.g. 30d or 6w")
+    amount, unit = int(match.group(1)), match.group(2) or "d"
+    return {"d": timedelta(days=amount), "w": timedelta(weeks=amount)}[unit]
+
+# =============================================================================
+# IDEMPOTENT GENERATION LEDGER
+# =============================================================================
+
+class PMLedger:
+    """Records which occurrences already have work orders and how far generation has got"""
+
+    def __init__(self, path: str = "pm_ledger.db"):
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pm_generated (
+                occurrence_key TEXT PRIMARY KEY,
+                generated_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pm_state (name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+
+    def pending(self, occurrences: List[PMOccurrence]) -> List[PMOccurrence]:
+        """Occurrences from the batch that have not been generated yet"""
+        if not occurrences:
+            return []
+        keys = [o.key for o in occurrences]
+        placeholders = ",".join("?" * len(keys))
+        existing = {row[0] for row in self._conn.execute(
+            f"SELECT occurrence_key FROM pm_generated WHERE occurrence_key IN ({placeholders})", keys
+        )}
+        return [o for o in occurrences if o.key not in existing]
+
+    def record(self, occurrence_keys: List[str]):
+        """Mark occurrences as generated"""
+        now = datetime.now().isoformat()
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pm_generated (occurrence_key, generated_at) VALUES (?, ?)",
+                [(key, now) for key in occurrence_keys]
+            )
+
+    def generated_through(self) -> Optional[date]:
+        """Every occurrence due before this date has been generated (None before the first run)"""
+        row = self._conn.execute("SELECT value FROM pm_state WHERE name = 'generated_through'").fetchone()
+        return date.fromisoformat(row[0]) if row else None
+
+    def mark_generated_through(self, day: date):
+        self._conn.execute(
+            "INSERT INTO pm_state (name, value) VALUES ('generated_through', ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (day.isoformat(),)
+        )
+
+    def close(self):
+        self._conn.close()
+
+def batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,192 @@
+"""
+Maintenance Operations Center - Route-Aware Daily Planning
+
+Orders a technician's day to cut travel between buildings:
+- Building coordinate registry with a precomputed travel-time matrix
+- Nearest-neighbour construction followed by 2-opt improvement
+- Priority deadlines enforced through a lateness penalty, emergencies first
+- Routine stops that cannot finish by the end of the working day are deferred
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+
+# Penalty (in travel minutes) per minute a stop finishes after its deadline
+LATENESS_WEIGHT = 10.0
+
+# =============================================================================
+# BUILDING REGISTRY
+# =============================================================================
+
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+class BuildingRegistry:
+    """Building coordinates with all pairwise travel times computed up front"""
+
+    def __init__(self, coordinates: Dict[str, Tuple[float, float]], average_speed_kmh: float = 30.0,
+                 road_factor: float = 1.3, unknown_travel_minutes: float = 20.0):
+        self.names = sorted(coordinates)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.coordinates = coordinates
+        self.unknown_travel_minutes = unknown_travel_minutes
+        # Straight-line distance scaled by a road factor approximates street travel
+        self.minutes = [
+            [haversine_km(coordinates[a], coordinates[b]) * road_factor / average_speed_kmh * 60 for b in self.names]
+            for a in self.names
+        ]
+
+    def travel_minutes(self, origin: Optional[str], destination: str) -> float:
+        if origin == destination:
+            return 0.0
+        i, j = self.index.get(origin), self.index.get(destination)
+        if i is None or j is None:
+            return self.unknown_travel_minutes
+        return self.minutes[i][j]
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "BuildingRegistry":
+        """Load `{"Building A": {"lat": ..., "lon": ...}, ...}`"""
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls({name: (coords["lat"], coords["lon"]) for name, coords in data.items()}, **kwargs)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "BuildingRegistry":
+        """Load the `building_registry` section of config_rules.json"""
+        section = config["building_registry"]
+        return cls(
+            {name: (coords["lat"], coords["lon"]) for name, coords in section["buildings"].items()},
+            average_speed_kmh=section.get("average_speed_kmh", 30.0),
+            road_factor=section.get("road_factor", 1.3)
+        )
+
+# =============================================================================
+# ROUTE PLANNING
+# =============================================================================
+
+@dataclass
+class Stop:
+    """A work order to visit during the day"""
+    work_order_id: str
+    building: str
+    duration_hours: float
+    deadline: Optional[datetime] = None
+    emergency: bool = False
+
+@dataclass
+class PlannedStop:
+    stop: Stop
+    travel_minutes: float
+    arrival: datetime
+    departure: datetime
+
+    @property
+    def late(self) -> bool:
+        return self.stop.deadline is not None and self.departure > self.stop.deadline
+
+@dataclass
+class RoutePlan:
+    stops: List[PlannedStop]
+    travel_minutes: float
+    lateness_minutes: float
+    # Routine stops left for another day because they would run past the end of the day
+    deferred: List[Stop] = field(default_factory=list)
+
+def _simulate(order: List[Stop], registry: BuildingRegistry, origin: Optional[str],
+              start: datetime) -> Tuple[float, float, List[PlannedStop]]:
+    clock = start
+    location = origin
+    travel_total = 0.0
+    lateness_total = 0.0
+    planned = []
+    for stop in order:
+        travel = registry.travel_minutes(location, stop.building)
+        arrival = clock + timedelta(minutes=travel)
+        departure = arrival + timedelta(hours=stop.duration_hours)
+        if stop.deadline is not None and departure > stop.deadline:
+            lateness_total += (departure - stop.deadline).total_seconds() / 60
+        travel_total += travel
+        planned.append(PlannedStop(stop, travel, arrival, departure))
+        clock, location = departure, stop.building
+    return travel_total, lateness_total, planned
+
+def evaluate_route(order: List[Stop], registry: BuildingRegistry, origin: Optional[str], start: datetime) -> RoutePlan:
+    """Timings for visiting stops in the given order"""
+    travel, lateness, planned = _simulate(order, registry, origin, start)
+    return RoutePlan(planned, travel, lateness)
+
+def _cost(order: List[Stop], registry: BuildingRegistry, origin: Optional[str], start: datetime) -> float:
+    travel, lateness, _ = _simulate(order, registry, origin, start)
+    return travel + LATENESS_WEIGHT * lateness
+
+def _nearest_neighbour(stops: List[Stop], registry: BuildingRegistry, origin: Optional[str]) -> List[Stop]:
+    remaining = list(stops)
+    order = []
+    location = origin
+    while remaining:
+        # Prefer the closest stop, breaking ties by earliest deadline
+        best = min(remaining, key=lambda s: (registry.travel_minutes(location, s.building),
+                                             s.deadline or datetime.max))
+        remaining.remove(best)
+        order.append(best)
+        location = best.building
+    return order
+
+def _two_opt(order: List[Stop], registry: BuildingRegistry, origin: Optional[str], start: datetime,
+             max_passes: int = 20) -> List[Stop]:
+    best_cost = _cost(order, registry, origin, start)
+    for _ in range(max_passes):
+        improved = False
+        for i in range(len(order) - 1):
+            for j in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+                candidate_cost = _cost(candidate, registry, origin, start)
+                if candidate_cost < best_cost - 1e-9:
+                    order, best_cost, improved = candidate, candidate_cost, True
+        if not improved:
+            break
+    return order
+
+def _fit_before(order: List[Stop], registry: BuildingRegistry, origin: Optional[str], start: datetime,
+                end: datetime) -> Tuple[List[Stop], List[Stop]]:
+    """Keep stops in order while each still finishes by `end`; the rest are deferred"""
+    kept, deferred = [], []
+    clock, location = start, origin
+    for stop in order:
+        departure = (clock + timedelta(minutes=registry.travel_minutes(location, stop.building))
+                     + timedelta(hours=stop.duration_hours))
+        if departure <= end:
+            kept.append(stop)
+            clock, location = departure, stop.building
+        else:
+            deferred.append(stop)
+    return kept, deferred
+
+def plan_route(stops: List[Stop], registry: BuildingRegistry, origin: Optional[str], start: datetime,
+               end: Optional[datetime] = None) -> RoutePlan:
+    """Order stops to minimise travel while meeting deadlines; emergencies always go first
+
+    With an `end`, routine stops that would finish after it are deferred rather than
+    planned; emergencies are always planned, even past the end of the day.
+    """
+    emergencies = sorted((s for s in stops if s.emergency), key=lambda s: s.deadline or datetime.max)
+    routine = [s for s in stops if not s.emergency]
+
+    emergency_travel, emergency_lateness, planned = _simulate(emergencies, registry, origin, start)
+    if planned:
+        origin, start = emergencies[-1].building, planned[-1].departure
+
+    order = _two_opt(_nearest_neighbour(routine, registry, origin), registry, origin, start)
+    deferred = []
+    if end is not None:
+        order, deferred = _fit_before(order, registry, origin, start, end)
+    travel, lateness, routine_planned = _simulate(order, registry, origin, start)
+    return RoutePlan(planned + routine_planned, emergency_travel + travel, emergency_lateness + lateness, deferred)
@@ -0,0 +1,483 @@
+"""
+Maintenance Operations Center - Outbound SMS Dispatcher
+
+Batched, rate-limited delivery of tenant and technician notifications:
+- Durable SQLite outbox so queued messages survive restarts
+- Per-recipient coalescing of messages queued close together
+- Token-bucket rate limiting against the provider's send limits
+- Exponential backoff with full jitter on failed sends
+- Local stand-in HTTP gateway and throughput benchmark for development
+"""
+
+import asyncio
+import random
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+import aiohttp
+from aiohttp import web
+
+# Twilio concatenates long messages up to this many characters
+MAX_SMS_LENGTH = 1600
+
+# =============================================================================
+# RATE LIMITING
+# =============================================================================
+
+class TokenBucket:
+    """Async token bucket allowing `rate` sends per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0):
+        """Wait until `tokens` are available and consume them"""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+def backoff_with_jitter(attempt: int, base: float = 1.0, cap: float = 300.0) -> float:
+    """Full-jitter exponential backoff delay in seconds for the given attempt number"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+# =============================================================================
+# DURABLE OUTBOX
+# =============================================================================
+
+@dataclass
+class OutboundMessage:
+    """A single queued message as stored in the outbox"""
+    message_id: str
+    recipient: str
+    body: str
+    attempts: int = 0
+    work_order_id: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+@dataclass
+class CoalescedSend:
+    """One provider send covering one or more outbox messages for the same recipient"""
+    recipient: str
+    body: str
+    message_ids: List[str]
+    attempts: int
+
+class DurableOutbox:
+    """SQLite-backed outbox; rows stay 'pending' until the gateway accepts them"""
+
+    def __init__(self, path: str = "sms_outbox.db"):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                message_id TEXT PRIMARY KEY,
+                recipient TEXT NOT NULL,
+                body TEXT NOT NULL,
+                work_order_id TEXT,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_error TEXT
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at)"
+        )
+
+    def enqueue(self, recipient: str, body: str, work_order_id: Optional[str] = None) -> str:
+        """Persist a message and return its ID"""
+        return self.enqueue_many([(recipient, body, work_order_id)])[0]
+
+    def enqueue_many(self, messages: List[tuple]) -> List[str]:
+        """Persist (recipient, body, work_order_id) tuples in one transaction"""
+        now = time.time()
+        rows = [(uuid.uuid4().hex, recipient, body, work_order_id, now, now)
+                for recipient, body, work_order_id in messages]
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO outbox (message_id, recipient, body, work_order_id, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return [row[0] for row in rows]
+
+    def due(self, limit: int = 500) -> List[OutboundMessage]:
+        """Pending messages whose next attempt time has passed, oldest first"""
+        cursor = self._conn.execute(
+            "SELECT message_id, recipient, body, attempts, work_order_id, created_at FROM outbox "
+            "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY created_at LIMIT ?",
+            (time.time(), limit)
+        )
+        return [OutboundMessage(*row[:3], attempts=row[3], work_order_id=row[4], created_at=row[5])
+                for row in cursor.fetchall()]
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending message is due, or None if the outbox is empty"""
+        row = self._conn.execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+        ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def mark_sent(self, message_ids: List[str]):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE outbox SET status = 'sent', attempts = attempts + 1 WHERE message_id = ?",
+                [(mid,) for mid in message_ids]
+            )
+
+    def mark_retry(self, message_ids: List[str], delay: float, error: str):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE outbox SET attempts = attempts + 1, next_attempt_at = ?, last_error = ? "
+                "WHERE message_id = ?",
+                [(time.time() + delay, error, mid) for mid in message_ids]
+            )
+
+    def mark_failed(self, message_ids: List[str], error: str):
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? "
+                "WHERE message_id = ?",
+                [(error, mid) for mid in message_ids]
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """Message counts by status"""
+        cursor = self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status")
+        return dict(cursor.fetchall())
+
+    def close(self):
+        self._conn.close()
+
+def coalesce(messages: List[OutboundMessage], max_length: int = MAX_SMS_LENGTH) -> List[CoalescedSend]:
+    """Merge messages for the same recipient into as few sends as fit within `max_length`"""
+    by_recipient: Dict[str, List[OutboundMessage]] = {}
+    for message in messages:
+        by_recipient.setdefault(message.recipient, []).append(message)
+
+    sends = []
+    for recipient, queued in by_recipient.items():
+        current: Optional[CoalescedSend] = None
+        for message in queued:
+            if current and len(current.body) + 1 + len(message.body) <= max_length:
+                current.body += "\n" + message.body
+                current.message_ids.append(message.message_id)
+                current.attempts = max(current.attempts, message.attempts)
+            else:
+                current = CoalescedSend(recipient, message.body, [message.message_id], message.attempts)
+                sends.append(current)
+    return sends
+
+# =============================================================================
+# GATEWAY TRANSPORT
+# =============================================================================
+
+class GatewayError(Exception):
+    """Raised when the SMS gateway rejects or fails a batch"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class HTTPGatewayTransport:
+    """Sends batches to an SMS gateway exposing `POST /messages`"""
+
+    def __init__(self, base_url: str, api_key: str = "mock_key", timeout_seconds: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                headers={"Authorization": f"Bearer {self.api_key}"}
+            )
+        return self._session
+
+    async def send_batch(self, sends: List[CoalescedSend]) -> List[Optional[str]]:
+        """Send a batch; returns an error (None on success) per send, in order"""
+        session = await self._get_session()
+        payload = {"messages": [{"to": s.recipient, "body": s.body} for s in sends]}
+        try:
+            async with session.post(f"{self.base_url}/messages", json=payload) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise GatewayError(f"gateway returned {response.status}")
+                if response.status >= 400:
+                    raise GatewayError(f"gateway rejected batch ({response.status})", retryable=False)
+                data = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise GatewayError(f"gateway unreachable: {e}")
+        return [result.get("error") for result in data["results"]]
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+# =============================================================================
+# DISPATCHER
+# =============================================================================
+
+class SMSDispatcher:
+    """Drains the outbox through a transport in rate-limited, coalesced batches"""
+
+    def __init__(
+        self,
+        transport: Any,
+        outbox: DurableOutbox,
+        rate_per_second: float = 30.0,
+        burst: Optional[float] = None,
+        batch_size: int = 50,
+        max_in_flight: int = 4,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 1.0,
+        coalesce_window_seconds: float = 0.5
+    ):
+        self.transport = transport
+        self.outbox = outbox
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.coalesce_window_seconds = coalesce_window_seconds
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.stats = {"sent": 0, "coalesced": 0, "retried": 0, "failed": 0}
+
+    def enqueue(self, recipient: str, body: str, work_order_id: Optional[str] = None) -> str:
+        """Queue a message durably and wake the dispatcher"""
+        message_id = self.outbox.enqueue(recipient, body, work_order_id)
+        self._wakeup.set()
+        return message_id
+
+    def enqueue_many(self, messages: List[tuple]) -> List[str]:
+        """Queue (recipient, body, work_order_id) tuples durably and wake the dispatcher"""
+        message_ids = self.outbox.enqueue_many(messages)
+        self._wakeup.set()
+        return message_ids
+
+    async def _send(self, sends: List[CoalescedSend]):
+        async with self._in_flight:
+            try:
+                results = await self.transport.send_batch(sends)
+                retryable = True
+            except GatewayError as e:
+                results, retryable = [str(e)] * len(sends), e.retryable
+
+            for send, error in zip(sends, results):
+                if error is None:
+                    self.outbox.mark_sent(send.message_ids)
+                    self.stats["sent"] += 1
+                    self.stats["coalesced"] += len(send.message_ids) - 1
+                elif retryable and send.attempts + 1 < self.max_attempts:
+                    delay = backoff_with_jitter(send.attempts, base=self.retry_base_seconds)
+                    self.outbox.mark_retry(send.message_ids, delay, error)
+                    self.stats["retried"] += 1
+                else:
+                    self.outbox.mark_failed(send.message_ids, error)
+                    self.stats["failed"] += 1
+
+    async def dispatch_once(self, deadline: Optional[float] = None) -> int:
+        """Send everything currently due; returns the number of outbox messages handled
+
+        With a `deadline` (monotonic time), no new batch waits on the rate limiter past it;
+        messages left unsent stay pending in the outbox.
+        """
+        due = self.outbox.due(limit=self.batch_size * 20)
+        if not due:
+            return 0
+
+        sends = coalesce(due)
+        # A batch can never need more tokens than the bucket holds, or acquire would never return
+        batch_size = max(1, min(self.batch_size, int(self.bucket.capacity)))
+        tasks = []
+        handled = 0
+        for start in range(0, len(sends), batch_size):
+            batch = sends[start:start + batch_size]
+            if deadline is None:
+                await self.bucket.acquire(len(batch))
+            else:
+                try:
+                    await asyncio.wait_for(self.bucket.acquire(len(batch)),
+                                           timeout=max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    break
+            tasks.append(asyncio.create_task(self._send(batch)))
+            handled += sum(len(send.message_ids) for send in batch)
+        await asyncio.gather(*tasks)
+        return handled
+
+    async def run(self):
+        """Dispatch until stopped, sleeping until new messages or retries are due"""
+        while not self._stopping:
+            self._wakeup.clear()
+            # Give messages queued in quick succession a chance to coalesce
+            await asyncio.sleep(self.coalesce_window_seconds)
+            await self.dispatch_once()
+
+            wait_for = self.outbox.next_due_in()
+            if wait_for == 0:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait_for)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> asyncio.Task:
+        self._stopping = False
+        self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        self._stopping = True
+        self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def drain(self, timeout_seconds: float = 60.0):
+        """Dispatch until no pending messages remain or the timeout elapses"""
+        deadline = time.monotonic() + timeout_seconds
+        while time.monotonic() < deadline:
+            await self.dispatch_once(deadline)
+            wait_for = self.outbox.next_due_in()
+            if wait_for is None:
+                return
+            await asyncio.sleep(min(wait_for, max(0.0, deadline - time.monotonic())))
+
+# =============================================================================
+# LOCAL STAND-IN GATEWAY
+# =============================================================================
+
+class LocalSMSGateway:
+    """In-process HTTP stand-in for the SMS provider with configurable latency and failures"""
+
+    def __init__(self, latency_seconds: float = 0.0, failure_rate: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+        self.host = host
+        self.port = port
+        self.received: List[Dict[str, Any]] = []
+        self._runner: Optional[web.AppRunner] = None
+
+    async def _handle_messages(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if random.random() < self.failure_rate:
+            return web.json_response({"error": "simulated outage"}, status=503)
+
+        received_at = datetime.now().isoformat()
+        results = []
+        for message in payload["messages"]:
+            self.received.append({**message, "received_at": received_at})
+            results.append({"to": message["to"], "sid": uuid.uuid4().hex, "error": None})
+        return web.json_response({"results": results})
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/messages", self._handle_messages)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        # Resolve the ephemeral port when started with port=0
+        self.port = self._runner.addresses[0][1]
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+async def benchmark_throughput(
+    message_count: int = 5000,
+    recipient_count: int = 500,
+    rate_per_second: float = 2000.0,
+    batch_size: int = 100,
+    latency_seconds: float = 0.005,
+    failure_rate: float = 0.0,
+    outbox_path: Optional[str] = None
+) -> Dict[str, Any]:
+    """Push `message_count` messages through the local gateway and report msgs/sec"""
+    gateway = LocalSMSGateway(latency_seconds=latency_seconds, failure_rate=failure_rate)
+    await gateway.start()
+
+    path = outbox_path or str(Path.cwd() / f"sms_bench_{uuid.uuid4().hex[:8]}.db")
+    outbox = DurableOutbox(path)
+    transport = HTTPGatewayTransport(gateway.url)
+    dispatcher = SMSDispatcher(
+        transport, outbox,
+        rate_per_second=rate_per_second,
+        batch_size=batch_size,
+        retry_base_seconds=0.05
+    )
+
+    try:
+        dispatcher.enqueue_many([
+            (f"+1555{i % recipient_count:07d}", f"Building notice #{i}", None)
+            for i in range(message_count)
+        ])
+        started = time.perf_counter()
+        await dispatcher.drain(timeout_seconds=300)
+        elapsed = time.perf_counter() - started
+    finally:
+        await transport.close()
+        await gateway.stop()
+        outbox_counts = outbox.counts()
+        outbox.close()
+        if outbox_path is None:
+            for suffix in ("", "-wal", "-shm"):
+                Path(path + suffix).unlink(missing_ok=True)
+
+    return {
+        "messages": message_count,
+        "recipients": recipient_count,
+        "provider_sends": len(gateway.received),
+        "elapsed_seconds": elapsed,
+        "messages_per_second": message_count / elapsed if elapsed else float("inf"),
+        "outbox": outbox_counts,
+        "stats": dispatcher.stats,
+    }
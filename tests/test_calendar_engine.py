@@ -0,0 +1,116 @@
+import random
+from datetime import datetime, timedelta
+
+from calendar_engine import Booking, CalendarEngine, IntervalTree
+
+BASE = datetime(2026, 10, 19)  # a Monday
+
+def _at(hours, day=0):
+    return BASE + timedelta(days=day, hours=hours)
+
+def _brute_overlapping(bookings, start, end):
+    return sorted((b for b in bookings if b.start < end and b.end > start), key=lambda b: (b.start, b.event_id))
+
+def test_interval_tree_matches_brute_force_under_random_inserts_and_removes():
+    rng = random.Random(1234)
+    tree = IntervalTree()
+    live = []
+    for step in range(3000):
+        if live and rng.random() < 0.4:
+            booking = live.pop(rng.randrange(len(live)))
+            assert tree.remove(booking)
+        else:
+            start = BASE + timedelta(minutes=rng.randrange(0, 60 * 24 * 14, 15))
+            booking = Booking(start, start + timedelta(minutes=rng.randrange(15, 600, 15)), f"evt-{step}")
+            tree.insert(booking)
+            live.append(booking)
+
+        if step % 50 == 0:
+            query_start = BASE + timedelta(minutes=rng.randrange(0, 60 * 24 * 14))
+            query_end = query_start + timedelta(minutes=rng.randrange(1, 60 * 24 * 2))
+            assert list(tree.overlapping(query_start, query_end)) == _brute_overlapping(live, query_start, query_end)
+
+    assert len(tree) == len(live)
+    assert list(tree) == sorted(live, key=lambda b: (b.start, b.event_id))
+    assert not tree.remove(Booking(BASE, BASE + timedelta(hours=1), "never-inserted"))
+
+def test_interval_tree_stays_balanced():
+    tree = IntervalTree()
+    for i in range(1024):
+        tree.insert(Booking(_at(i), _at(i + 1), f"evt-{i}"))
+    # An AVL tree of n nodes is at most ~1.44 log2(n) high
+    assert tree._root.height <= 15
+
+def test_first_gap_at_window_edges():
+    tree = IntervalTree()
+    tree.insert(Booking(_at(9), _at(10), "a"))
+    tree.insert(Booking(_at(10), _at(12), "b"))
+    tree.insert(Booking(_at(13), _at(16), "c"))
+    hour = timedelta(hours=1)
+
+    # Free right at the window start
+    assert tree.first_gap(_at(8), _at(17), hour) == _at(8)
+    # Back-to-back bookings leave no gap between them; the first fit is after "b"
+    assert tree.first_gap(_at(9), _at(17), hour) == _at(12)
+    # A booking straddling the window start pushes the cursor to its end
+    assert tree.first_gap(_at(9.5), _at(17), hour) == _at(12)
+    # The gap has to fit entirely inside the window
+    assert tree.first_gap(_at(16), _at(17), hour) == _at(16)
+    assert tree.first_gap(_at(16), _at(16.5), hour) is None
+    assert tree.first_gap(_at(9), _at(17), timedelta(hours=2)) is None
+
+def _engine():
+    engine = CalendarEngine()
+    engine.register_technician("T-PLUMB-A", ["plumbing"], ["Building A"])
+    engine.register_technician("T-PLUMB-ANY", ["plumbing"])
+    engine.register_technician("T-ELEC-A", ["electrical"], ["Building A"])
+    return engine
+
+def test_find_earliest_slots_honours_skill_and_building_coverage():
+    engine = _engine()
+    engine.book("T-PLUMB-ANY", _at(8), _at(12), "busy-morning")
+    deadline = _at(17, day=1)
+
+    slots = engine.find_earliest_slots(2, deadline, skill="plumbing", building="Building A", not_before=_at(8))
+    assert [(s.technician_id, s.start) for s in slots] == [("T-PLUMB-A", _at(8)), ("T-PLUMB-ANY", _at(12))]
+
+    slots = engine.find_earliest_slots(2, deadline, skill="plumbing", building="Building B", not_before=_at(8))
+    assert [s.technician_id for s in slots] == ["T-PLUMB-ANY"]
+
+    assert engine.find_earliest_slots(2, deadline, skill="roofing", not_before=_at(8)) == []
+
+def test_find_earliest_slots_respects_working_hours():
+    engine = _engine()
+    friday_evening = _at(16, day=4)
+
+    slots = engine.find_earliest_slots(2, _at(17, day=7), skill="electrical", not_before=friday_evening)
+    # Too late on Friday and no weekend work, so Monday morning
+    assert [s.start for s in slots] == [_at(8, day=7)]
+
+    slots = engine.find_earliest_slots(2, _at(17, day=7), skill="electrical", not_before=friday_evening,
+                                       working_hours_only=False)
+    assert [s.start for s in slots] == [friday_evening]
+
+    assert engine.find_earliest_slots(2, _at(17, day=6), skill="electrical", not_before=friday_evening) == []
+
+def test_reserve_places_committed_work_in_order():
+    engine = _engine()
+    engine.book("T-PLUMB-A", _at(10), _at(11), "site-visit")
+
+    first = engine.reserve("T-PLUMB-A", 2, _at(8), "work-order:WO-1", "WO-1")
+    second = engine.reserve("T-PLUMB-A", 3, _at(8), "work-order:WO-2", "WO-2")
+    third = engine.reserve("T-PLUMB-A", 4, _at(8), "work-order:WO-3", "WO-3")
+
+    assert first == _at(8)
+    assert second == _at(11)
+    # Only 3 working hours remain on Monday, so the 4-hour job moves to Tuesday
+    assert third == _at(8, day=1)
+    assert [b.work_order_id for b in engine.trees["T-PLUMB-A"]] == ["WO-1", None, "WO-2", "WO-3"]
+
+def test_reserve_is_idempotent_per_event():
+    engine = _engine()
+
+    assert engine.reserve("T-PLUMB-A", 2, _at(8), "work-order:WO-1", "WO-1") == _at(8)
+    assert engine.reserve("T-PLUMB-A", 2, _at(8), "work-order:WO-1", "WO-1") == _at(8)
+    assert len(engine.trees["T-PLUMB-A"]) == 1
+    assert engine.reserve("T-UNKNOWN", 2, _at(8), "work-order:WO-9", "WO-9") is None
@@ -0,0 +1,101 @@
+import json
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from pm_recurrence import RecurrenceRule, due_between, parse_horizon, schedules_from_config
+
+CONFIG = json.loads((Path(__file__).resolve().parent.parent / "config_rules.json").read_text())
+
+def _between(rrule, dtstart, start, end):
+    return list(RecurrenceRule.parse(rrule, dtstart).between(start, end))
+
+def test_monthly_clamps_to_month_end_without_drifting():
+    occurrences = _between("FREQ=MONTHLY", date(2024, 1, 31), date(2024, 1, 1), date(2024, 7, 1))
+
+    assert occurrences == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31),
+                           date(2024, 4, 30), date(2024, 5, 31), date(2024, 6, 30)]
+
+def test_yearly_bymonth_with_interval_skips_off_years():
+    occurrences = _between("FREQ=YEARLY;INTERVAL=2;BYMONTH=11,10", date(2021, 3, 15),
+                           date(2022, 1, 1), date(2026, 1, 1))
+
+    assert occurrences == [date(2023, 10, 15), date(2023, 11, 15), date(2025, 10, 15), date(2025, 11, 15)]
+
+def test_yearly_bymonth_clamps_anchor_day():
+    occurrences = _between("FREQ=YEARLY;BYMONTH=2", date(2023, 1, 31), date(2023, 1, 1), date(2025, 1, 1))
+
+    assert occurrences == [date(2023, 2, 28), date(2024, 2, 29)]
+
+def test_count_is_measured_from_dtstart_when_window_starts_late():
+    rrule = "FREQ=MONTHLY;COUNT=5"
+
+    assert _between(rrule, date(2024, 1, 10), date(2024, 4, 1), date(2025, 1, 1)) == [date(2024, 4, 10),
+                                                                                       date(2024, 5, 10)]
+    assert _between(rrule, date(2024, 1, 10), date(2024, 6, 1), date(2025, 1, 1)) == []
+
+def test_until_is_inclusive():
+    occurrences = _between("FREQ=WEEKLY;INTERVAL=2;UNTIL=20240213", date(2024, 1, 2),
+                           date(2024, 1, 1), date(2025, 1, 1))
+
+    assert occurrences == [date(2024, 1, 2), date(2024, 1, 16), date(2024, 1, 30), date(2024, 2, 13)]
+
+def test_window_far_from_dtstart():
+    occurrences = _between("FREQ=DAILY;INTERVAL=3", date(2000, 1, 1), date(2030, 1, 1), date(2030, 1, 10))
+
+    assert occurrences == [date(2030, 1, 2), date(2030, 1, 5), date(2030, 1, 8)]
+    assert _between("FREQ=DAILY", date(2024, 5, 1), date(2024, 1, 1), date(2024, 5, 3)) == [date(2024, 5, 1),
+                                                                                          date(2024, 5, 2)]
+
+def test_parse_round_trip_and_rejects_unknown_frequency():
+    rule = RecurrenceRule.parse("RRULE:FREQ=YEARLY;INTERVAL=2;BYMONTH=11,10;COUNT=3", date(2024, 1, 1))
+
+    assert rule.to_rrule() == "FREQ=YEARLY;INTERVAL=2;BYMONTH=10,11;COUNT=3"
+    assert RecurrenceRule.parse(rule.to_rrule(), date(2024, 1, 1)) == rule
+    with pytest.raises(ValueError):
+        RecurrenceRule.parse("FREQ=HOURLY", date(2024, 1, 1))
+
+def test_parse_horizon():
+    assert parse_horizon("30d").days == 30
+    assert parse_horizon("6w").days == 42
+    assert parse_horizon("14").days == 14
+    with pytest.raises(ValueError):
+        parse_horizon("12h")
+
+def test_shipped_config_schedules():
+    assets = [
+        {"asset_id": "BLR-1", "asset_type": "boiler", "building": "Building A", "installed_on": "2019-05-20"},
+        {"asset_id": "HVAC-7", "asset_type": "hvac", "building": "Building B", "unit": "3C",
+         "installed_on": "2024-02-15"},
+    ]
+    schedules = schedules_from_config(CONFIG, assets)
+    by_task = {(s.asset_id, s.task): s for s in schedules}
+
+    assert set(by_task) == {("BLR-1", "boiler_maintenance"), ("HVAC-7", "hvac_maintenance"),
+                            ("HVAC-7", "filter_replacement")}
+    window = (date(2026, 1, 1), date(2028, 1, 1))
+    # Boiler service falls in the first month of the October-November preparation season
+    assert list(by_task["BLR-1", "boiler_maintenance"].rule.between(*window)) == [date(2026, 10, 1),
+                                                                                   date(2027, 10, 1)]
+    assert by_task["BLR-1", "boiler_maintenance"].notes == ["drainage required", "anode rod replacement"]
+    assert list(by_task["HVAC-7", "hvac_maintenance"].rule.between(date(2026, 1, 1), date(2027, 1, 1))) == [
+        date(2026, 2, 15), date(2026, 8, 15)]
+    assert list(by_task["HVAC-7", "filter_replacement"].rule.between(date(2026, 1, 1), date(2027, 1, 1))) == [
+        date(2026, 2, 15), date(2026, 5, 15), date(2026, 8, 15), date(2026, 11, 15)]
+
+    merged = list(due_between(schedules, date(2026, 1, 1), date(2027, 1, 1)))
+    assert [o.due for o in merged] == sorted(o.due for o in merged)
+    assert merged[0].key == "PM-HVAC-7-filter_replacement-20260215"
+
+def test_rrule_override_replaces_configured_schedule():
+    assets = [{"asset_id": "HVAC-7", "asset_type": "hvac", "building": "Building B", "installed_on": "2024-02-15",
+               "rrules": {"filter_replacement": "FREQ=MONTHLY;INTERVAL=2"}}]
+    schedules = {s.task: s for s in schedules_from_config(CONFIG, assets)}
+
+    assert schedules["filter_replacement"].rule.interval == 2
+    assert schedules["hvac_maintenance"].rule.interval == 6
+
+def test_asset_without_installed_on_is_rejected():
+    with pytest.raises(ValueError, match="installed_on"):
+        schedules_from_config(CONFIG, [{"asset_id": "BLR-2", "asset_type": "boiler", "building": "Building C"}])
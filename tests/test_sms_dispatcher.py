@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+
+from sms_dispatcher import (
+    DurableOutbox, HTTPGatewayTransport, LocalSMSGateway, SMSDispatcher, TokenBucket
+)
+
+async def _drain(outbox_path, messages, gateway=None, timeout_seconds=10.0, **dispatcher_kwargs):
+    gateway = gateway or LocalSMSGateway()
+    await gateway.start()
+    outbox = DurableOutbox(outbox_path)
+    transport = HTTPGatewayTransport(gateway.url)
+    dispatcher = SMSDispatcher(transport, outbox, **dispatcher_kwargs)
+    try:
+        dispatcher.enqueue_many(messages)
+        await dispatcher.drain(timeout_seconds=timeout_seconds)
+        return gateway, dispatcher, outbox.counts()
+    finally:
+        await transport.close()
+        await gateway.stop()
+        outbox.close()
+
+def test_messages_for_one_recipient_are_coalesced(tmp_path):
+    messages = [("+15550000001", f"Water shut off notice {i}", "WO-1") for i in range(3)]
+    messages.append(("+15550000002", "Technician en route", "WO-2"))
+
+    gateway, dispatcher, counts = asyncio.run(_drain(str(tmp_path / "outbox.db"), messages))
+
+    assert counts == {"sent": 4}
+    assert len(gateway.received) == 2
+    bodies = {message["to"]: message["body"] for message in gateway.received}
+    assert bodies["+15550000001"] == "\n".join(f"Water shut off notice {i}" for i in range(3))
+    assert dispatcher.stats["coalesced"] == 2
+
+def test_retryable_failures_are_retried_then_marked_failed(tmp_path):
+    gateway = LocalSMSGateway(failure_rate=1.0)
+    messages = [("+15550000001", "Boiler outage", None), ("+15550000002", "Boiler outage", None)]
+
+    gateway, dispatcher, counts = asyncio.run(_drain(
+        str(tmp_path / "outbox.db"), messages, gateway=gateway,
+        max_attempts=3, retry_base_seconds=0.01
+    ))
+
+    assert counts == {"failed": 2}
+    assert gateway.received == []
+    # Two retries per send before the third attempt gives up
+    assert dispatcher.stats["retried"] == 4
+    assert dispatcher.stats["failed"] == 2
+
+def test_pending_messages_survive_restart(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    outbox = DurableOutbox(path)
+    outbox.enqueue_many([(f"+1555000000{i}", "Elevator inspection tomorrow", None) for i in range(3)])
+    outbox.close()
+
+    gateway, _, counts = asyncio.run(_drain(path, []))
+
+    assert counts == {"sent": 3}
+    assert sorted(message["to"] for message in gateway.received) == [f"+1555000000{i}" for i in range(3)]
+
+def test_batch_larger_than_burst_is_split(tmp_path):
+    messages = [(f"+1555{i:07d}", "Fire alarm test at noon", None) for i in range(120)]
+
+    gateway, _, counts = asyncio.run(_drain(
+        str(tmp_path / "outbox.db"), messages,
+        rate_per_second=100.0, batch_size=500, coalesce_window_seconds=0
+    ))
+
+    assert counts == {"sent": 120}
+    assert len(gateway.received) == 120
+
+def test_drain_timeout_bounds_rate_limit_wait(tmp_path):
+    messages = [(f"+1555{i:07d}", "Parking lot repaving", None) for i in range(50)]
+
+    started = time.monotonic()
+    _, _, counts = asyncio.run(_drain(
+        str(tmp_path / "outbox.db"), messages, timeout_seconds=0.5,
+        rate_per_second=5.0, coalesce_window_seconds=0
+    ))
+
+    assert time.monotonic() - started < 3.0
+    assert counts["pending"] > 0
+    assert counts["sent"] + counts["pending"] == 50
+
+def test_token_bucket_rejects_requests_above_capacity():
+    bucket = TokenBucket(rate=10.0, capacity=5.0)
+    with pytest.raises(ValueError):
+        asyncio.run(bucket.acquire(6))
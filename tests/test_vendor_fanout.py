@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from vendor_fanout import (
+    StubVendorBehaviour, StubVendorEndpoint, VendorEndpointClient, VendorProfile, VendorRegistry, fan_out
+)
+
+def _vendor(vendor_id, **kwargs):
+    defaults = {"name": vendor_id, "categories": ["plumbing"], "specialties": ["boilers"]}
+    return VendorProfile(vendor_id=vendor_id, **{**defaults, **kwargs})
+
+async def _fan_out(behaviours, vendors, deadline_seconds=2.0, max_budget=None):
+    endpoint = StubVendorEndpoint(default=StubVendorBehaviour(latency_seconds=0.0))
+    for vendor_id, behaviour in behaviours.items():
+        endpoint.configure(vendor_id, behaviour)
+    await endpoint.start()
+    for vendor in vendors:
+        vendor.endpoint = endpoint.vendor_url(vendor.vendor_id)
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = VendorEndpointClient(session)
+            started = datetime.now()
+            ranked = await fan_out(
+                {"work_order_id": "WO-1", "description": "Boiler not firing"},
+                vendors,
+                started + timedelta(seconds=deadline_seconds),
+                client.request_quote,
+                max_budget=max_budget
+            )
+            return ranked, (datetime.now() - started).total_seconds()
+    finally:
+        await endpoint.stop()
+
+def test_slow_vendor_times_out_at_deadline():
+    vendors = [_vendor("fast"), _vendor("slow")]
+    behaviours = {"slow": StubVendorBehaviour(latency_seconds=2.0)}
+
+    ranked, elapsed = asyncio.run(_fan_out(behaviours, vendors, deadline_seconds=0.3))
+
+    assert [quote.vendor_id for quote in ranked.quotes] == ["fast"]
+    assert ranked.timed_out == ["slow"]
+    assert ranked.failures == {}
+    assert elapsed < 1.0
+
+def test_failing_vendor_is_recorded_as_failure():
+    vendors = [_vendor("reliable"), _vendor("broken")]
+    behaviours = {"broken": StubVendorBehaviour(latency_seconds=0.0, failure_rate=1.0)}
+
+    ranked, _ = asyncio.run(_fan_out(behaviours, vendors))
+
+    assert [quote.vendor_id for quote in ranked.quotes] == ["reliable"]
+    assert list(ranked.failures) == ["broken"]
+    assert "503" in ranked.failures["broken"]
+    assert ranked.timed_out == []
+
+def test_quotes_are_ranked_by_score():
+    vendors = [
+        _vendor("cheap", quality_score=0.9),
+        _vendor("pricey", quality_score=0.9),
+        _vendor("sloppy", quality_score=0.3),
+    ]
+    behaviours = {
+        "cheap": StubVendorBehaviour(latency_seconds=0.05, quote_amount=200.0),
+        "pricey": StubVendorBehaviour(latency_seconds=0.0, quote_amount=500.0),
+        "sloppy": StubVendorBehaviour(latency_seconds=0.0, quote_amount=200.0),
+    }
+
+    ranked, _ = asyncio.run(_fan_out(behaviours, vendors, max_budget=1000.0))
+
+    assert [quote.vendor_id for quote in ranked.quotes] == ["cheap", "pricey", "sloppy"]
+    assert ranked.best.vendor_id == "cheap"
+    scores = [quote.score for quote in ranked.quotes]
+    assert scores == sorted(scores, reverse=True)
+
+def test_registry_match_applies_budget_cutoff():
+    registry = VendorRegistry([
+        _vendor("budget", min_quote=100.0, quality_score=0.6),
+        _vendor("standard", min_quote=500.0, quality_score=0.9),
+        _vendor("premium", min_quote=2000.0, quality_score=0.95),
+    ])
+
+    assert [v.vendor_id for v in registry.match("plumbing", ["boilers"], max_budget=500.0)] == ["standard", "budget"]
+    assert [v.vendor_id for v in registry.match("plumbing", ["boilers"], max_budget=99.0)] == []
+    assert [v.vendor_id for v in registry.match("plumbing", ["boilers"])] == ["premium", "standard", "budget"]
+
+def test_registry_match_is_case_insensitive_and_requires_every_specialty():
+    registry = VendorRegistry([
+        _vendor("boilers-only", categories=["Plumbing"], specialties=["Boilers"]),
+        _vendor("full-service", categories=["plumbing"], specialties=["boilers", "Water Heaters"]),
+        _vendor("electrician", categories=["electrical"], specialties=["boilers"]),
+    ])
+
+    assert [v.vendor_id for v in registry.match("PLUMBING", ["boilers"])] == ["boilers-only", "full-service"]
+    assert [v.vendor_id for v in registry.match("plumbing", ["BOILERS", "water heaters"])] == ["full-service"]
+    assert registry.match("plumbing", ["roofing"]) == []
@@ -0,0 +1,91 @@
+import asyncio
+import os
+
+from voice_ingest import EmergencyScreen, VoiceCheckpoints, VoiceWatcher
+
+async def _watch(directory, checkpoint_path, during=None, extract_delay=0.0, gate=None, **watcher_kwargs):
+    """Run a watcher over `directory`, call `during(directory)`, then stop; returns extracted transcripts"""
+    extracted, results = [], []
+
+    async def extract(transcript):
+        extracted.append(transcript)
+        if gate is not None:
+            await gate.wait()
+        await asyncio.sleep(extract_delay)
+        return {"priority_indicators": []}
+
+    async def on_result(result):
+        results.append(result)
+
+    checkpoints = VoiceCheckpoints(str(checkpoint_path))
+    watcher = VoiceWatcher(str(directory), extract, on_result, EmergencyScreen(["flood", "gas leak"]),
+                           checkpoints, file_pattern="*.txt", settle_seconds=0.01, **watcher_kwargs)
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    try:
+        await asyncio.sleep(0.2)
+        if during is not None:
+            await during(directory)
+        if gate is not None:
+            gate.set()
+        await asyncio.sleep(0.2)
+        stop.set()
+        await asyncio.wait_for(task, timeout=10)
+    finally:
+        checkpoints.close()
+    return extracted, results
+
+def _drop(directory, name, text, mtime=None):
+    path = directory / name
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+def test_repeated_events_and_identical_rewrites_extract_once(tmp_path):
+    drops = tmp_path / "drops"
+    drops.mkdir()
+
+    async def during(directory):
+        path = _drop(directory, "leak.txt", "Dripping faucet in unit 4B")
+        await asyncio.sleep(0.1)
+        # Rewrites with the same content raise fresh close events while extraction is running
+        path.write_text("Dripping faucet in unit 4B")
+        await asyncio.sleep(0.1)
+        path.write_text("Dripping faucet in unit 4B")
+
+    extracted, results = asyncio.run(_watch(drops, tmp_path / "checkpoints.db", during, extract_delay=0.3))
+
+    assert extracted == ["Dripping faucet in unit 4B"]
+    assert len(results) == 1
+
+def test_emergency_is_extracted_before_earlier_routine_drops(tmp_path):
+    drops = tmp_path / "drops"
+    drops.mkdir()
+    for offset, (name, text) in enumerate([("a.txt", "Squeaky door"), ("b.txt", "Loose cabinet handle"),
+                                           ("c.txt", "Burnt out hallway bulb"),
+                                           ("d.txt", "Basement flood, water rising")]):
+        _drop(drops, name, text, mtime=1_700_000_000 + offset)
+
+    # The single extraction worker is held on the first drop until the rest are queued
+    extracted, _ = asyncio.run(_watch(drops, tmp_path / "checkpoints.db", gate=asyncio.Event(),
+                                      transcription_workers=1, extraction_workers=1))
+
+    assert extracted == ["Squeaky door", "Basement flood, water rising", "Loose cabinet handle",
+                         "Burnt out hallway bulb"]
+
+def test_restart_skips_files_already_done(tmp_path):
+    drops = tmp_path / "drops"
+    drops.mkdir()
+    checkpoint_path = tmp_path / "checkpoints.db"
+    _drop(drops, "first.txt", "No hot water in unit 2A")
+
+    first_run, _ = asyncio.run(_watch(drops, checkpoint_path))
+    assert first_run == ["No hot water in unit 2A"]
+
+    _drop(drops, "second.txt", "Gas leak smell near boiler room")
+    second_run, results = asyncio.run(_watch(drops, checkpoint_path))
+
+    assert second_run == ["Gas leak smell near boiler room"]
+    assert [result.path.name for result in results] == ["second.txt"]
+    assert results[0].emergency
@@ -0,0 +1,123 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from work_order_store import WorkOrderStore, synthetic_work_orders
+
+class _Priority(BaseModel):
+    level: str
+    response_time_hours: int
+    keywords_matched: List[str] = []
+
+class _Status(BaseModel):
+    current: str
+    updated_by: str
+    history: List[Any] = []
+
+class _WorkOrder(BaseModel):
+    """Stand-in with the same nested shape as `main.WorkOrder`"""
+    id: str
+    title: str
+    description: str
+    building: str
+    unit: Optional[str] = None
+    priority: _Priority
+    status: _Status
+    assigned_technician: Optional[str] = None
+    estimated_duration_hours: float
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    photos: List[Dict[str, Any]] = []
+    communication_log: List[Dict[str, Any]] = []
+
+def _store_with(orders):
+    store = WorkOrderStore()
+    store.add_many(orders)
+    return store
+
+def test_round_trip_returns_the_data_it_was_given():
+    orders = list(synthetic_work_orders(300))
+    orders[7]["estimated_duration_hours"] = 1.3
+    orders[8]["unit"] = None
+    orders[9]["assigned_technician"] = None
+    store = _store_with(orders)
+    try:
+        for order in orders:
+            assert store.to_dict(order["id"]) == order
+
+        model = store.materialize(orders[7]["id"], _WorkOrder)
+        assert model == _WorkOrder.model_validate(orders[7])
+        assert model.estimated_duration_hours == 1.3
+    finally:
+        store.close()
+
+def test_records_expose_hot_fields_and_load_cold_fields_lazily():
+    orders = list(synthetic_work_orders(5))
+    store = _store_with(orders)
+    try:
+        record = store.get(orders[3]["id"])
+        assert record.building == orders[3]["building"]
+        assert record.status == orders[3]["status"]["current"]
+        assert record.priority == orders[3]["priority"]["level"]
+        assert record.created_at == datetime.fromisoformat(orders[3]["created_at"])
+        assert record.communication_log == orders[3]["communication_log"]
+        assert record.photos == orders[3]["photos"]
+        assert store.get("WO-missing") is None
+    finally:
+        store.close()
+
+def test_missing_timestamps_read_back_as_none():
+    order = next(synthetic_work_orders(1))
+    order["created_at"] = None
+    order["updated_at"] = None
+    store = _store_with([order])
+    try:
+        record = store.get(order["id"])
+        assert record.created_at is None
+        assert record.updated_at is None
+    finally:
+        store.close()
+
+def test_column_scans_match_a_plain_scan():
+    orders = list(synthetic_work_orders(1000))
+    store = _store_with(orders)
+    try:
+        for status in ("completed", "in_progress", "unknown"):
+            for technician in (None, "TECH003"):
+                for building in (None, "Building C"):
+                    expected = [row for row, order in enumerate(orders)
+                                if order["status"]["current"] == status
+                                and technician in (None, order["assigned_technician"])
+                                and building in (None, order["building"])]
+                    assert store.rows_where(status, technician, building) == expected
+
+        expected_counts: Dict[str, int] = {}
+        expected_by_technician: Dict[str, Dict[str, int]] = {}
+        for order in orders:
+            status = order["status"]["current"]
+            expected_counts[status] = expected_counts.get(status, 0) + 1
+            per_technician = expected_by_technician.setdefault(order["assigned_technician"], {})
+            per_technician[status] = per_technician.get(status, 0) + 1
+        assert store.status_counts() == expected_counts
+        assert store.technician_status_counts() == expected_by_technician
+    finally:
+        store.close()
+
+def test_hot_field_updates_show_up_in_dumps_and_scans():
+    orders = list(synthetic_work_orders(10))
+    store = _store_with(orders)
+    work_order_id = orders[0]["id"]
+    try:
+        store.set_status(work_order_id, "ready_review", updated_at=datetime(2024, 6, 1, 9, 30))
+        store.assign(work_order_id, "TECH099")
+
+        data = store.to_dict(work_order_id)
+        assert data["status"]["current"] == "ready_review"
+        assert data["status"]["updated_by"] == orders[0]["status"]["updated_by"]
+        assert data["updated_at"] == "2024-06-01T09:30:00"
+        assert data["assigned_technician"] == "TECH099"
+        assert store.rows_where(status="ready_review", technician="TECH099") == [0]
+        assert store.technician_status_counts()["TECH099"] == {"ready_review": 1}
+    finally:
+        store.close()
@@ -0,0 +1,269 @@
+"""
+Maintenance Operations Center - Vendor Matching and Request Fan-Out
+
+Finds qualified vendors and collects their quotes concurrently:
+- Registry with inverted indexes on category and specialty plus a sorted budget index
+- Concurrent fan-out to matched vendors, bounded by the request's response deadline
+- Responses scored and ranked incrementally as they arrive
+- Local stub vendor endpoint with configurable latency and failure rates
+"""
+
+import asyncio
+import bisect
+import json
+import random
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Callable, Iterable, Set
+
+import aiohttp
+from aiohttp import web
+
+# =============================================================================
+# VENDOR REGISTRY
+# =============================================================================
+
+@dataclass
+class VendorProfile:
+    """A pre-qualified vendor and how to reach it"""
+    vendor_id: str
+    name: str
+    categories: List[str]
+    specialties: List[str]
+    endpoint: Optional[str] = None
+    min_quote: float = 0.0
+    quality_score: float = 0.8
+    response_time_hours: float = 24.0
+
+class VendorRegistry:
+    """Vendor lookup by category, specialty and budget without scanning every vendor"""
+
+    def __init__(self, vendors: Iterable[VendorProfile] = ()):
+        self.vendors: Dict[str, VendorProfile] = {}
+        self.by_category: Dict[str, Set[str]] = {}
+        self.by_specialty: Dict[str, Set[str]] = {}
+        # Parallel sorted lists: vendors ordered by their minimum quote
+        self._quote_keys: List[float] = []
+        self._quote_ids: List[str] = []
+        for vendor in vendors:
+            self.add(vendor)
+
+    def add(self, vendor: VendorProfile):
+        if vendor.vendor_id in self.vendors:
+            self.remove(vendor.vendor_id)
+        self.vendors[vendor.vendor_id] = vendor
+        for category in vendor.categories:
+            self.by_category.setdefault(category.lower(), set()).add(vendor.vendor_id)
+        for specialty in vendor.specialties:
+            self.by_specialty.setdefault(specialty.lower(), set()).add(vendor.vendor_id)
+        index = bisect.bisect_right(self._quote_keys, vendor.min_quote)
+        self._quote_keys.insert(index, vendor.min_quote)
+        self._quote_ids.insert(index, vendor.vendor_id)
+
+    def remove(self, vendor_id: str):
+        vendor = self.vendors.pop(vendor_id)
+        for category in vendor.categories:
+            self.by_category[category.lower()].discard(vendor_id)
+        for specialty in vendor.specialties:
+            self.by_specialty[specialty.lower()].discard(vendor_id)
+        index = self._quote_ids.index(vendor_id)
+        del self._quote_keys[index]
+        del self._quote_ids[index]
+
+    def within_budget(self, max_budget: Optional[float]) -> Set[str]:
+        """Vendors whose minimum quote fits under `max_budget`"""
+        if max_budget is None:
+            return set(self._quote_ids)
+        return set(self._quote_ids[:bisect.bisect_right(self._quote_keys, max_budget)])
+
+    def match(self, category: str, specialties: List[str], max_budget: Optional[float] = None) -> List[VendorProfile]:
+        """Vendors in `category` covering every required specialty within budget, best quality first"""
+        candidates = set(self.by_category.get(category.lower(), ()))
+        # Intersect the smallest posting lists first
+        postings = sorted((self.by_specialty.get(s.lower(), set()) for s in specialties), key=len)
+        for posting in postings:
+            if not candidates:
+                break
+            candidates &= posting
+        if candidates and max_budget is not None:
+            candidates &= self.within_budget(max_budget)
+        return sorted((self.vendors[v] for v in candidates), key=lambda v: (-v.quality_score, v.vendor_id))
+
+    @classmethod
+    def from_file(cls, path: str) -> "VendorRegistry":
+        with open(path, "r") as f:
+            return cls(VendorProfile(**vendor) for vendor in json.load(f))
+
+# =============================================================================
+# SCORING AND RANKING
+# =============================================================================
+
+@dataclass
+class VendorQuote:
+    """A vendor's reply to a request"""
+    vendor_id: str
+    quote_amount: float
+    earliest_start: datetime
+    received_at: datetime
+    notes: str = ""
+    score: float = 0.0
+
+def score_quote(quote: VendorQuote, vendor: VendorProfile, max_budget: Optional[float],
+                needed_by: datetime, now: datetime) -> float:
+    """0-1 score weighing price against budget, vendor quality and how soon they can start"""
+    budget = max_budget or max(quote.quote_amount, 1.0) * 2
+    price = max(0.0, 1.0 - quote.quote_amount / budget)
+    window = max((needed_by - now).total_seconds(), 1.0)
+    availability = max(0.0, 1.0 - max((quote.earliest_start - now).total_seconds(), 0.0) / window)
+    return round(0.4 * price + 0.4 * vendor.quality_score + 0.2 * availability, 4)
+
+class RankedResponses:
+    """Keeps quotes ordered by score as they arrive"""
+
+    def __init__(self):
+        self._keys: List[tuple] = []
+        self.quotes: List[VendorQuote] = []
+        self.failures: Dict[str, str] = {}
+        self.timed_out: List[str] = []
+
+    def add(self, quote: VendorQuote) -> int:
+        """Insert a quote and return its current rank (0 is best)"""
+        key = (-quote.score, quote.quote_amount, quote.vendor_id)
+        index = bisect.bisect_left(self._keys, key)
+        self._keys.insert(index, key)
+        self.quotes.insert(index, quote)
+        return index
+
+    @property
+    def best(self) -> Optional[VendorQuote]:
+        return self.quotes[0] if self.quotes else None
+
+# =============================================================================
+# FAN-OUT
+# =============================================================================
+
+class VendorEndpointClient:
+    """Posts vendor requests to each vendor's HTTP endpoint"""
+
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+
+    async def request_quote(self, vendor: VendorProfile, request: Dict[str, Any]) -> VendorQuote:
+        async with self.session.post(f"{vendor.endpoint.rstrip('/')}/requests", json=request) as response:
+            if response.status >= 400:
+                raise RuntimeError(f"vendor endpoint returned {response.status}")
+            data = await response.json()
+        return VendorQuote(
+            vendor_id=vendor.vendor_id,
+            quote_amount=float(data["quote_amount"]),
+            earliest_start=datetime.fromisoformat(data["earliest_start"]),
+            received_at=datetime.now(),
+            notes=data.get("notes", "")
+        )
+
+async def fan_out(
+    request: Dict[str, Any],
+    vendors: List[VendorProfile],
+    deadline: datetime,
+    request_quote: Callable,
+    max_budget: Optional[float] = None,
+    needed_by: Optional[datetime] = None,
+    on_response: Optional[Callable[[VendorQuote, int], None]] = None
+) -> RankedResponses:
+    """Send `request` to every vendor at once and rank replies until `deadline`
+
+    `request_quote(vendor, request)` is awaited per vendor. Vendors that have not
+    replied by the deadline are cancelled and listed in `timed_out`.
+    """
+    ranked = RankedResponses()
+    needed_by = needed_by or deadline
+    by_task = {asyncio.create_task(request_quote(vendor, request)): vendor for vendor in vendors}
+    pending = set(by_task)
+
+    while pending:
+        remaining = (deadline - datetime.now()).total_seconds()
+        if remaining <= 0:
+            break
+        done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            vendor = by_task[task]
+            if task.exception() is not None:
+                ranked.failures[vendor.vendor_id] = str(task.exception())
+                continue
+            quote = task.result()
+            quote.score = score_quote(quote, vendor, max_budget, needed_by, datetime.now())
+            rank = ranked.add(quote)
+            if on_response:
+                on_response(quote, rank)
+
+    for task in pending:
+        task.cancel()
+        ranked.timed_out.append(by_task[task].vendor_id)
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+    return ranked
+
+# =============================================================================
+# STUB VENDOR ENDPOINT
+# =============================================================================
+
+@dataclass
+class StubVendorBehaviour:
+    """Simulated behaviour for one vendor on the stub endpoint"""
+    latency_seconds: float = 0.1
+    latency_jitter_seconds: float = 0.0
+    failure_rate: float = 0.0
+    quote_amount: float = 250.0
+    start_delay_hours: float = 24.0
+
+class StubVendorEndpoint:
+    """Local HTTP server answering `/vendors/{vendor_id}/requests` with simulated quotes"""
+
+    def __init__(self, default: Optional[StubVendorBehaviour] = None, host: str = "127.0.0.1", port: int = 0):
+        self.default = default or StubVendorBehaviour()
+        self.behaviours: Dict[str, StubVendorBehaviour] = {}
+        self.host = host
+        self.port = port
+        self.requests_received: List[Dict[str, Any]] = []
+        self._runner: Optional[web.AppRunner] = None
+
+    def configure(self, vendor_id: str, behaviour: StubVendorBehaviour):
+        self.behaviours[vendor_id] = behaviour
+
+    def vendor_url(self, vendor_id: str) -> str:
+        return f"http://{self.host}:{self.port}/vendors/{vendor_id}"
+
+    async def _handle_request(self, request: web.Request) -> web.Response:
+        vendor_id = request.match_info["vendor_id"]
+        behaviour = self.behaviours.get(vendor_id, self.default)
+        self.requests_received.append({"vendor_id": vendor_id, **(await request.json())})
+
+        await asyncio.sleep(behaviour.latency_seconds + random.uniform(0, behaviour.latency_jitter_seconds))
+        if random.random() < behaviour.failure_rate:
+            return web.json_response({"error": "simulated vendor failure"}, status=503)
+        return web.json_response({
+            "quote_amount": behaviour.quote_amount,
+            "earliest_start": (datetime.now() + timedelta(hours=behaviour.start_delay_hours)).isoformat(),
+            "notes": f"Stub quote from {vendor_id}"
+        })
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/vendors/{vendor_id}/requests", self._handle_request)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        self.port = self._runner.addresses[0][1]
+        return f"http://{self.host}:{self.port}"
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+def quote_to_response(quote: VendorQuote) -> Dict[str, Any]:
+    """Serialize a quote for storage in `VendorRequest.vendor_responses`"""
+    data = asdict(quote)
+    data["earliest_start"] = quote.earliest_start.isoformat()
+    data["received_at"] = quote.received_at.isoformat()
+    return data
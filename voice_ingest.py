@@ -0,0 +1,354 @@
+"""
+Maintenance Operations Center - Streaming Voice Ingestion
+
+Processes voicemails as soon as they land in a drop directory:
+- inotify-backed directory watching (watchdog), plus a catch-up scan on start
+- Audio transcribed one window at a time so large recordings never sit fully in memory;
+  text transcripts are small and loaded whole, since extraction needs the full text
+- Transcription -> voice_agent extraction -> emergency keyword screening
+- Emergency transcripts jump ahead of routine ones in the extraction queue
+- SQLite checkpoints per file content hash, so restarts never reprocess work
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import sqlite3
+import wave
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, List, Dict, Any, Callable, Iterator, Awaitable
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from sms_dispatcher import backoff_with_jitter
+
+CHUNK_BYTES = 1024 * 1024
+AUDIO_WINDOW_SECONDS = 30
+TRANSCRIPT_SUFFIXES = (".txt",)
+
+EMERGENCY_PRIORITY = 0
+ROUTINE_PRIORITY = 1
+
+# =============================================================================
+# CHUNKED READING AND TRANSCRIPTION
+# =============================================================================
+
+def file_digest(path: Path, chunk_bytes: int = CHUNK_BYTES) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_wav_windows(path: Path, window_seconds: int = AUDIO_WINDOW_SECONDS) -> Iterator[tuple]:
+    """Yield (pcm_bytes, sample_rate, sample_width, channels) one window at a time"""
+    with wave.open(str(path), "rb") as recording:
+        frames_per_window = recording.getframerate() * window_seconds
+        while True:
+            frames = recording.readframes(frames_per_window)
+            if not frames:
+                return
+            yield frames, recording.getframerate(), recording.getsampwidth(), recording.getnchannels()
+
+class MockTranscriber:
+    """Placeholder transcription matching `batch-voice` until a speech service is configured"""
+
+    async def transcribe(self, path: Path) -> str:
+        return f"Mock transcript for {path.name}"
+
+class WhisperTranscriber:
+    """Local Whisper transcription, fed one audio window at a time"""
+
+    def __init__(self, model_name: str = "base"):
+        import whisper
+        self.model = whisper.load_model(model_name)
+
+    def _transcribe_window(self, frames: bytes, sample_rate: int, sample_width: int, channels: int) -> str:
+        import numpy as np
+
+        if sample_width != 2:
+            raise ValueError("Only 16-bit PCM recordings are supported")
+        audio = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1)
+        if sample_rate != 16000:
+            # Whisper expects 16 kHz input; linear resampling is adequate for speech
+            target = np.linspace(0, len(audio) - 1, int(len(audio) * 16000 / sample_rate))
+            audio = np.interp(target, np.arange(len(audio)), audio).astype(np.float32)
+        return self.model.transcribe(audio, fp16=False)["text"].strip()
+
+    async def transcribe(self, path: Path) -> str:
+        parts = []
+        for window in read_wav_windows(path):
+            parts.append(await asyncio.to_thread(self._transcribe_window, *window))
+        return " ".join(part for part in parts if part)
+
+async def load_transcript(path: Path, transcriber: Any) -> str:
+    """Transcript for a dropped file: text files are read whole, audio is transcribed"""
+    if path.suffix.lower() in TRANSCRIPT_SUFFIXES:
+        return path.read_text(encoding="utf-8", errors="replace").strip()
+    return await transcriber.transcribe(path)
+
+# =============================================================================
+# EMERGENCY SCREENING
+# =============================================================================
+
+class EmergencyScreen:
+    """Matches transcripts against the emergency keywords in config_rules.json"""
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = [keyword.lower() for keyword in keywords]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "EmergencyScreen":
+        return cls(config["priority_classification"]["emergency"]["keywords"])
+
+    def matches(self, text: str) -> List[str]:
+        lowered = text.lower()
+        return [keyword for keyword in self.keywords if keyword in lowered]
+
+# =============================================================================
+# CHECKPOINTS
+# =============================================================================
+
+class VoiceCheckpoints:
+    """Per-file progress keyed by content hash; a finished file is never processed twice"""
+
+    def __init__(self, path: str = "voice_checkpoints.db"):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS voice_checkpoints (
+                digest TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                transcript TEXT,
+                result TEXT,
+                updated_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(
+            "SELECT stage, transcript, result FROM voice_checkpoints WHERE digest = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"stage": row[0], "transcript": row[1], "result": json.loads(row[2]) if row[2] else None}
+
+    def save(self, digest: str, path: Path, stage: str, transcript: Optional[str] = None,
+             result: Optional[Dict[str, Any]] = None):
+        self._conn.execute(
+            "INSERT INTO voice_checkpoints (digest, path, stage, transcript, result, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(digest) DO UPDATE SET stage = excluded.stage, "
+            "transcript = COALESCE(excluded.transcript, transcript), "
+            "result = COALESCE(excluded.result, result), updated_at = excluded.updated_at",
+            (digest, str(path), stage, transcript, json.dumps(result, default=str) if result else None,
+             datetime.now().isoformat())
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+# =============================================================================
+# WATCH PIPELINE
+# =============================================================================
+
+@dataclass
+class VoiceResult:
+    """Outcome of processing one dropped file"""
+    path: Path
+    transcript: str
+    extraction: Dict[str, Any]
+    emergency_keywords: List[str] = field(default_factory=list)
+
+    @property
+    def emergency(self) -> bool:
+        return bool(self.emergency_keywords)
+
+class _DropHandler(FileSystemEventHandler):
+    """Forwards new and changed files from the watchdog thread into the event loop
+
+    Close events only come from the inotify backend; created/modified events cover
+    FSEvents and Windows, with `_wait_until_settled` absorbing partial writes.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, callback: Callable[[Path], None]):
+        self.loop = loop
+        self.callback = callback
+
+    def _forward(self, event):
+        if not event.is_directory:
+            self.loop.call_soon_threadsafe(self.callback, Path(event.src_path))
+
+    def on_closed(self, event):
+        self._forward(event)
+
+    def on_created(self, event):
+        self._forward(event)
+
+    def on_modified(self, event):
+        self._forward(event)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.loop.call_soon_threadsafe(self.callback, Path(event.dest_path))
+
+class VoiceWatcher:
+    """Watches a drop directory and streams each new file through the voice pipeline"""
+
+    def __init__(
+        self,
+        directory: str,
+        extract: Callable[[str], Awaitable[Dict[str, Any]]],
+        on_result: Callable[[VoiceResult], Awaitable[None]],
+        screen: EmergencyScreen,
+        checkpoints: VoiceCheckpoints,
+        transcriber: Optional[Any] = None,
+        file_pattern: str = "*.wav",
+        transcription_workers: int = 2,
+        extraction_workers: int = 2,
+        settle_seconds: float = 1.0,
+        max_queued: int = 100,
+        max_extraction_attempts: int = 3,
+        retry_base_seconds: float = 2.0
+    ):
+        self.directory = Path(directory)
+        self.extract = extract
+        self.on_result = on_result
+        self.screen = screen
+        self.checkpoints = checkpoints
+        self.transcriber = transcriber or MockTranscriber()
+        self.file_pattern = file_pattern
+        self.transcription_workers = transcription_workers
+        self.extraction_workers = extraction_workers
+        self.settle_seconds = settle_seconds
+        self.max_extraction_attempts = max_extraction_attempts
+        self.retry_base_seconds = retry_base_seconds
+        # Arrivals are only paths; transcripts wait in a bounded queue to cap memory
+        self._arrivals: asyncio.Queue = asyncio.Queue()
+        self._extractions: asyncio.PriorityQueue = asyncio.PriorityQueue(maxsize=max_queued)
+        self._sequence = itertools.count()
+        self._seen: set = set()
+        # Digests queued or being processed, held until their checkpoint reaches "done"
+        self._in_flight: set = set()
+        self._retries: set = set()
+
+    def _matches(self, path: Path) -> bool:
+        return path.match(self.file_pattern) and path.is_file()
+
+    def _on_arrival(self, path: Path):
+        if self._matches(path) and path not in self._seen:
+            self._seen.add(path)
+            self._arrivals.put_nowait(path)
+
+    async def _wait_until_settled(self, path: Path):
+        """Wait for writers that do not close the file in one go (e.g. network copies)"""
+        size = -1
+        while path.exists() and path.stat().st_size != size:
+            size = path.stat().st_size
+            await asyncio.sleep(self.settle_seconds)
+
+    async def _transcription_worker(self):
+        while True:
+            path = await self._arrivals.get()
+            digest = None
+            try:
+                await self._wait_until_settled(path)
+                if not path.exists():
+                    continue
+                digest = await asyncio.to_thread(file_digest, path)
+                # Repeated close events and copies of a file already in the pipeline are no-ops
+                if digest in self._in_flight:
+                    continue
+                self._in_flight.add(digest)
+                checkpoint = self.checkpoints.get(digest)
+                if checkpoint and checkpoint["stage"] == "done":
+                    self._in_flight.discard(digest)
+                    continue
+                if checkpoint and checkpoint["transcript"] is not None:
+                    transcript = checkpoint["transcript"]
+                else:
+                    transcript = await load_transcript(path, self.transcriber)
+                    self.checkpoints.save(digest, path, "transcribed", transcript=transcript)
+
+                # Cheap keyword screen before the slower agent call decides queue order
+                keywords = self.screen.matches(transcript)
+                priority = EMERGENCY_PRIORITY if keywords else ROUTINE_PRIORITY
+                await self._extractions.put((priority, next(self._sequence), digest, path, transcript, keywords, 0))
+            except Exception as e:
+                self._in_flight.discard(digest)
+                await self.on_result(VoiceResult(path, "", {"error": str(e)}))
+            finally:
+                self._seen.discard(path)
+                self._arrivals.task_done()
+
+    async def _retry_later(self, item: tuple, delay: float):
+        await asyncio.sleep(delay)
+        await self._extractions.put(item)
+
+    async def _extraction_worker(self):
+        while True:
+            item = await self._extractions.get()
+            priority, _, digest, path, transcript, screened, attempt = item
+            retrying = False
+            try:
+                extraction = await self.extract(transcript)
+                self.checkpoints.save(digest, path, "extracted", result=extraction)
+                indicators = " ".join(extraction.get("priority_indicators", []))
+                keywords = self.screen.matches(f"{transcript} {indicators}")
+                await self.on_result(VoiceResult(path, transcript, extraction, keywords))
+                self.checkpoints.save(digest, path, "done")
+            except Exception as e:
+                if attempt + 1 < self.max_extraction_attempts:
+                    # Requeue at the same priority so an emergency keeps its place at the front
+                    retry = (priority, next(self._sequence), digest, path, transcript, screened, attempt + 1)
+                    task = asyncio.create_task(self._retry_later(
+                        retry, backoff_with_jitter(attempt, base=self.retry_base_seconds)
+                    ))
+                    self._retries.add(task)
+                    task.add_done_callback(self._retries.discard)
+                    retrying = True
+                else:
+                    # Keep the pre-screen matches so a failed emergency is still escalated
+                    await self.on_result(VoiceResult(path, transcript, {"error": str(e)}, screened))
+            finally:
+                # Released once done or out of retries; finished files are skipped via the checkpoint
+                if not retrying:
+                    self._in_flight.discard(digest)
+                self._extractions.task_done()
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """Catch up on files already present, then process new arrivals until `stop` is set"""
+        loop = asyncio.get_running_loop()
+        observer = Observer()
+        observer.schedule(_DropHandler(loop, self._on_arrival), str(self.directory), recursive=False)
+        observer.start()
+
+        workers = [asyncio.create_task(self._transcription_worker()) for _ in range(self.transcription_workers)]
+        workers += [asyncio.create_task(self._extraction_worker()) for _ in range(self.extraction_workers)]
+        try:
+            for path in sorted(self.directory.glob(self.file_pattern), key=lambda p: p.stat().st_mtime):
+                self._on_arrival(path)
+            await (stop or asyncio.Event()).wait()
+            await self._arrivals.join()
+            while True:
+                await self._extractions.join()
+                if not self._retries:
+                    break
+                await asyncio.gather(*list(self._retries))
+        finally:
+            observer.stop()
+            await asyncio.to_thread(observer.join)
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
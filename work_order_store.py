@@ -0,0 +1,406 @@
+"""
+Maintenance Operations Center - Compact Work Order Store
+
+Columnar in-memory storage for large work order histories (reports, analytics):
+- Hot fields held in typed arrays, one column per field
+- Building, unit, status, priority and technician strings interned to small integer codes
+- Titles, descriptions, photos and communication logs kept in SQLite side storage, loaded lazily
+- Pydantic WorkOrder models rebuilt only at the API boundary via `materialize`
+
+This is a library for bulk history loads (analytics jobs, imports); the CLI's live
+work orders stay in `coord.work_orders` and closed ones move to the archive tier.
+"""
+
+import array
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Tuple
+
+# Fields kept in memory; everything else lives in side storage
+HOT_FIELDS = ("id", "building", "unit", "status", "priority", "assigned_technician",
+              "created_at", "updated_at", "estimated_duration_hours")
+
+_NO_TIMESTAMP = float("nan")
+
+# =============================================================================
+# STRING INTERNING
+# =============================================================================
+
+class CodeTable:
+    """Maps repeated strings to dense integer codes; code 0 is reserved for None"""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            value = sys.intern(value)
+            self.values.append(value)
+            self.codes[value] = code
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        return self.values[code]
+
+    def lookup(self, value: Optional[str]) -> Optional[int]:
+        """Code for an existing value, or None if it has never been seen"""
+        return 0 if value is None else self.codes.get(value)
+
+# =============================================================================
+# ROW VIEW
+# =============================================================================
+
+class WorkOrderRecord:
+    """Lightweight read-only view of one stored work order"""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "WorkOrderStore", row: int):
+        self._store = store
+        self._row = row
+
+    @property
+    def id(self) -> str:
+        return self._store._ids[self._row]
+
+    @property
+    def building(self) -> str:
+        return self._store.buildings.decode(self._store._building[self._row])
+
+    @property
+    def unit(self) -> Optional[str]:
+        return self._store.units.decode(self._store._unit[self._row])
+
+    @property
+    def status(self) -> str:
+        return self._store.statuses.decode(self._store._status[self._row])
+
+    @property
+    def priority(self) -> str:
+        return self._store.priorities.decode(self._store._priority[self._row])
+
+    @property
+    def assigned_technician(self) -> Optional[str]:
+        return self._store.technicians.decode(self._store._technician[self._row])
+
+    @property
+    def created_at(self) -> Optional[datetime]:
+        value = self._store._created_at[self._row]
+        return None if value != value else datetime.fromtimestamp(value)
+
+    @property
+    def updated_at(self) -> Optional[datetime]:
+        value = self._store._updated_at[self._row]
+        return None if value != value else datetime.fromtimestamp(value)
+
+    @property
+    def estimated_duration_hours(self) -> float:
+        return self._store._duration[self._row]
+
+    @property
+    def communication_log(self) -> List[Dict[str, Any]]:
+        return self._store.load_cold(self.id).get("communication_log", [])
+
+    @property
+    def photos(self) -> List[Dict[str, Any]]:
+        return self._store.load_cold(self.id).get("photos", [])
+
+    def __repr__(self) -> str:
+        return f"WorkOrderRecord(id={self.id!r}, building={self.building!r}, status={self.status!r})"
+
+# =============================================================================
+# COLUMNAR STORE
+# =============================================================================
+
+def _timestamp(value: Any) -> float:
+    if value is None:
+        return _NO_TIMESTAMP
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.timestamp()
+
+def hot_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pull hot fields out of a work order dump, unwrapping nested status/priority"""
+    status = data.get("status")
+    priority = data.get("priority")
+    return {
+        "id": data["id"],
+        "building": data["building"],
+        "unit": data.get("unit"),
+        "status": status.get("current") if isinstance(status, dict) else status,
+        "priority": priority.get("level") if isinstance(priority, dict) else priority,
+        "assigned_technician": data.get("assigned_technician"),
+        "created_at": data.get("created_at"),
+        "updated_at": data.get("updated_at"),
+        "estimated_duration_hours": data.get("estimated_duration_hours") or 0.0,
+    }
+
+class WorkOrderStore:
+    """Append-only columnar work order storage with lazily loaded side data"""
+
+    def __init__(self, side_storage_path: Optional[str] = None):
+        """Cold fields go to `side_storage_path`, or a temporary file removed on `close`
+
+        ":memory:" keeps them in process memory instead, which defeats the point for
+        large histories.
+        """
+        self.buildings = CodeTable()
+        self.units = CodeTable()
+        self.statuses = CodeTable()
+        self.priorities = CodeTable()
+        self.technicians = CodeTable()
+
+        self._ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._building = array.array("I")
+        self._unit = array.array("I")
+        self._status = array.array("B")
+        self._priority = array.array("B")
+        self._technician = array.array("H")
+        self._created_at = array.array("d")
+        self._updated_at = array.array("d")
+        # Doubles, not floats: durations like 1.3 must come back exactly at the API boundary
+        self._duration = array.array("d")
+
+        self._owned_path = None
+        if side_storage_path is None:
+            fd, side_storage_path = tempfile.mkstemp(prefix="work_orders_", suffix=".db")
+            os.close(fd)
+            self._owned_path = side_storage_path
+        self._side = sqlite3.connect(side_storage_path)
+        self._side.execute("CREATE TABLE IF NOT EXISTS cold (id TEXT PRIMARY KEY, payload TEXT NOT NULL)")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, work_order_id: str) -> bool:
+        return work_order_id in self._row_of
+
+    def __iter__(self) -> Iterator[WorkOrderRecord]:
+        return (WorkOrderRecord(self, row) for row in range(len(self._ids)))
+
+    def get(self, work_order_id: str) -> Optional[WorkOrderRecord]:
+        row = self._row_of.get(work_order_id)
+        return None if row is None else WorkOrderRecord(self, row)
+
+    # -------------------------------------------------------------------------
+    # Ingest
+    # -------------------------------------------------------------------------
+
+    def _append_hot(self, hot: Dict[str, Any]):
+        work_order_id = sys.intern(hot["id"])
+        self._row_of[work_order_id] = len(self._ids)
+        self._ids.append(work_order_id)
+        self._building.append(self.buildings.encode(hot["building"]))
+        self._unit.append(self.units.encode(hot["unit"]))
+        self._status.append(self.statuses.encode(hot["status"]))
+        self._priority.append(self.priorities.encode(hot["priority"]))
+        self._technician.append(self.technicians.encode(hot["assigned_technician"]))
+        self._created_at.append(_timestamp(hot["created_at"]))
+        self._updated_at.append(_timestamp(hot["updated_at"]))
+        self._duration.append(hot["estimated_duration_hours"])
+
+    def add_many(self, work_orders: Iterable[Any], batch_size: int = 5000):
+        """Ingest WorkOrder models or their dict dumps, spilling cold fields to side storage"""
+        batch: List[Tuple[str, str]] = []
+        for work_order in work_orders:
+            data = work_order if isinstance(work_order, dict) else work_order.model_dump(mode="json")
+            if data["id"] in self._row_of:
+                raise ValueError(f"Work order {data['id']} is already stored")
+            self._append_hot(hot_values(data))
+            batch.append((data["id"], json.dumps(data, default=str)))
+            if len(batch) >= batch_size:
+                self._write_cold(batch)
+                batch = []
+        if batch:
+            self._write_cold(batch)
+
+    def add(self, work_order: Any):
+        self.add_many([work_order])
+
+    def _write_cold(self, rows: List[Tuple[str, str]]):
+        with self._side:
+            self._side.executemany("INSERT OR REPLACE INTO cold (id, payload) VALUES (?, ?)", rows)
+
+    # -------------------------------------------------------------------------
+    # Updates to hot fields
+    # -------------------------------------------------------------------------
+
+    def set_status(self, work_order_id: str, status: str, updated_at: Optional[datetime] = None):
+        row = self._row_of[work_order_id]
+        self._status[row] = self.statuses.encode(status)
+        self._updated_at[row] = (updated_at or datetime.now()).timestamp()
+
+    def assign(self, work_order_id: str, technician_id: Optional[str]):
+        row = self._row_of[work_order_id]
+        self._technician[row] = self.technicians.encode(technician_id)
+
+    # -------------------------------------------------------------------------
+    # Cold data and the API boundary
+    # -------------------------------------------------------------------------
+
+    def load_cold(self, work_order_id: str) -> Dict[str, Any]:
+        row = self._side.execute("SELECT payload FROM cold WHERE id = ?", (work_order_id,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def to_dict(self, work_order_id: str) -> Dict[str, Any]:
+        """Full work order dump with current hot values merged over the stored cold data"""
+        record = self.get(work_order_id)
+        if record is None:
+            raise KeyError(work_order_id)
+        data = self.load_cold(work_order_id)
+        data.update(
+            building=record.building,
+            unit=record.unit,
+            assigned_technician=record.assigned_technician,
+            estimated_duration_hours=record.estimated_duration_hours,
+        )
+        data.setdefault("status", {})
+        data.setdefault("priority", {})
+        if isinstance(data["status"], dict):
+            data["status"]["current"] = record.status
+        else:
+            data["status"] = record.status
+        if isinstance(data["priority"], dict):
+            data["priority"]["level"] = record.priority
+        else:
+            data["priority"] = record.priority
+        if record.updated_at is not None:
+            data["updated_at"] = record.updated_at.isoformat()
+        return data
+
+    def materialize(self, work_order_id: str, model_cls: Any) -> Any:
+        """Rebuild the pydantic model for one work order"""
+        return model_cls.model_validate(self.to_dict(work_order_id))
+
+    # -------------------------------------------------------------------------
+    # Column scans for reports
+    # -------------------------------------------------------------------------
+
+    def rows_where(self, status: Optional[str] = None, technician: Optional[str] = None,
+                   building: Optional[str] = None) -> List[int]:
+        """Row numbers matching all given filters"""
+        filters = []
+        for column, table, value in ((self._status, self.statuses, status),
+                                     (self._technician, self.technicians, technician),
+                                     (self._building, self.buildings, building)):
+            if value is None:
+                continue
+            code = table.lookup(value)
+            if code is None:
+                return []
+            filters.append((column, code))
+        if not filters:
+            return list(range(len(self._ids)))
+        column, code = filters[0]
+        rows = [row for row, value in enumerate(column) if value == code]
+        for column, code in filters[1:]:
+            rows = [row for row in rows if column[row] == code]
+        return rows
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = [0] * len(self.statuses.values)
+        for code in self._status:
+            counts[code] += 1
+        return {self.statuses.decode(code): n for code, n in enumerate(counts) if n}
+
+    def technician_status_counts(self) -> Dict[Optional[str], Dict[str, int]]:
+        """Per-technician status counts in a single pass over two columns"""
+        counts: Dict[Tuple[int, int], int] = {}
+        for technician, status in zip(self._technician, self._status):
+            counts[(technician, status)] = counts.get((technician, status), 0) + 1
+        result: Dict[Optional[str], Dict[str, int]] = {}
+        for (technician, status), n in counts.items():
+            result.setdefault(self.technicians.decode(technician), {})[self.statuses.decode(status)] = n
+        return result
+
+    def close(self):
+        self._side.close()
+        if self._owned_path:
+            os.unlink(self._owned_path)
+            self._owned_path = None
+
+# =============================================================================
+# MEMORY BENCHMARK
+# =============================================================================
+
+def synthetic_work_orders(count: int) -> Iterator[Dict[str, Any]]:
+    """Work order dumps shaped like `WorkOrder.model_dump(mode="json")`"""
+    statuses = ["new", "scheduled", "in_progress", "ready_review", "completed", "cancelled"]
+    priorities = [("emergency", 2), ("high", 24), ("medium", 72), ("low", 168), ("cosmetic", 168)]
+    base = datetime(2024, 1, 1).timestamp()
+    for i in range(count):
+        level, hours = priorities[i % len(priorities)]
+        created = datetime.fromtimestamp(base + i * 600).isoformat()
+        yield {
+            "id": f"WO{20240101000000 + i}",
+            "title": f"Leaking faucet in unit {100 + i % 400}",
+            "description": f"Tenant reports a slow drip under the kitchen sink, request #{i}",
+            "building": f"Building {chr(65 + i % 20)}",
+            "unit": str(100 + i % 400),
+            "priority": {"level": level, "response_time_hours": hours, "keywords_matched": ["leak"]},
+            "status": {"current": statuses[i % len(statuses)], "updated_by": "coordinator", "history": []},
+            "assigned_technician": f"TECH{1 + i % 12:03d}",
+            "estimated_duration_hours": 2.5,
+            "created_at": created,
+            "updated_at": created,
+            "photos": [{"filename": f"before_{i}.jpg", "metadata": {"building": f"Building {chr(65 + i % 20)}"}}],
+            "communication_log": [
+                {"timestamp": created, "channel": "sms", "message": "Your request has been received"},
+                {"timestamp": created, "channel": "sms", "message": "A technician has been scheduled"},
+            ],
+        }
+
+def _measure(variant: str, count: int, queue: Any):
+    # RSS rather than tracemalloc: SQLite's page cache is allocated outside Python's allocator
+    import resource
+
+    baseline = None
+    store = None
+    if variant == "models":
+        try:
+            from main import WorkOrder
+        except ImportError:
+            WorkOrder = None
+        # Built straight from the generator so the source dicts never coexist with the models
+        if WorkOrder is not None:
+            held = [WorkOrder.model_validate(data) for data in synthetic_work_orders(count)]
+            baseline = "pydantic"
+        else:
+            held = list(synthetic_work_orders(count))
+            baseline = "dicts"  # plain dicts are a lower bound on model overhead
+    else:
+        store = WorkOrderStore()
+        store.add_many(synthetic_work_orders(count))
+    queue.put({"baseline": baseline,
+               "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024})
+    if store is not None:
+        store.close()
+
+def benchmark_memory(count: int = 100_000) -> Dict[str, Dict[str, Any]]:
+    """Peak RSS holding `count` work orders as models versus the file-backed columnar store
+
+    Each variant runs in a fresh process so peak RSS is not shared between them.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for variant in ("models", "store"):
+        queue = context.Queue()
+        process = context.Process(target=_measure, args=(variant, count, queue))
+        process.start()
+        results[variant] = queue.get()
+        process.join()
+    return results